@@ -0,0 +1,58 @@
+"""
+管理游戏数据的二进制缓存
+
+用法:
+    python -m src.CacheService warm [--namespace Vanilla SVE]    预先生成缓存
+    python -m src.CacheService clear                             清除全部缓存
+
+游戏版本更新后无需手动清除缓存，源文件变化时会自动重新解析；clear 主要用于释放磁盘空间。
+"""
+import argparse
+
+from src.ItemService import *
+
+# 不属于 GameData 但同样需要缓存的文件
+_EXTRA_FILES: list[Path] = [
+    Path(__file__).parent.parent / "json" / "CraftingRecipes.json",
+    Path(__file__).parent.parent / "json" / "CookingRecipes.json",
+]
+
+
+def warm(namespaces: list[str]) -> None:
+    """
+    读取指定命名空间下的全部数据文件，生成缓存
+    :param namespaces: 需要生成缓存的命名空间
+    """
+    for namespace in namespaces:
+        GameData(namespace).preload()
+        print(f"{namespace} 缓存已生成")
+
+    if "Vanilla" in namespaces:
+        for filepath in _EXTRA_FILES:
+            json_cache.read(filepath)
+
+
+def clear() -> None:
+    """删除全部缓存文件"""
+    count = json_cache.clear()
+    print(f"已删除 {count} 个缓存文件")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="管理游戏数据的二进制缓存")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    warm_parser = subparsers.add_parser("warm", help="预先生成缓存")
+    warm_parser.add_argument("--namespace", nargs="+", choices=["Vanilla", "SVE"], default=["Vanilla", "SVE"])
+    subparsers.add_parser("clear", help="清除全部缓存")
+
+    args = parser.parse_args()
+    match args.command:
+        case "warm":
+            warm(args.namespace)
+        case "clear":
+            clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,60 @@
+from typing import Callable, Iterator
+
 from src.RecipeService import *
+from src.Infobox_generator.Infobox_template import InfoboxTemplate
+from src.Infobox_generator.Infobox_writer import InfoboxRecord, write_stdout
+
+INFOBOX = InfoboxTemplate(
+    "craft",
+    ["name", "eng", "description", "source", "sellprice", "recipe", "ingredients", "produces"],
+    width=15
+)
 
 
 def generate_infobox() -> None:
     """生成 Infobox craft 并打印"""
+    write_stdout(iter_infobox())
+
+
+def iter_infobox(item_filter: Callable[[str], bool] | None = None) -> Iterator[InfoboxRecord]:
+    """
+    逐个生成 Infobox craft，返回 (物品 ID, 页面标题, wikitext)
+    :param item_filter: 传入物品 ID，返回 False 时跳过该物品，留空则生成全部物品
+    """
     recipes = recipe_data.crafting_recipe_objects
 
     for recipe_name, recipe_info in recipes.items():
         product: Object | BigCraftable = recipe_info.product
+        if item_filter is not None and not item_filter(product.itemID):
+            continue
+
         eng = recipe_name
         name = game_data.get_display_name(product.itemID)
         sellprice = product.get_field("Price")
         produces = product.quantity if int(product.quantity) > 1 else ""
         ingredients = materials_to_string(recipe_info.materials)
 
-        infobox = f"""{name}：\n
-<onlyinclude>{{{{{{{{{{1|Infobox craft}}}}}}
-|name            = {name}
-|eng             = {eng}
-|description     = {{{{Description|{eng}}}}}
-|source          = [[打造]]
-|sellprice       = {sellprice}
-|recipe          = ---------- 配方来源，这里要自己填 ----------
-|ingredients     = {ingredients}
-|produces        = {produces}
-}}}}</onlyinclude>
-'''{name}'''是一种[[打造|打造物品]]，\n"""
-        print(infobox)
+        infobox = INFOBOX.render({
+            "name": name, "eng": eng, "description": f"{{{{Description|{eng}}}}}", "source": "[[打造]]",
+            "sellprice": sellprice, "recipe": "---------- 配方来源，这里要自己填 ----------",
+            "ingredients": ingredients, "produces": produces
+        }, suffix=f"\n'''{name}'''是一种[[打造|打造物品]]，\n")
+        yield product.itemID, name, infobox
+
+
+def get_inputs(item_id: str) -> list:
+    """
+    获取生成该物品的 Infobox 所需的全部原始数据，用于增量生成时判断物品是否变化
+    :param item_id: 配方产物的物品 ID
+    """
+    inputs: list = [game_data.get_display_name(item_id)]
+    for recipe_name, recipe_info in recipe_data.crafting_recipe_objects.items():
+        if recipe_info.product.itemID != item_id:
+            continue
+        inputs.append(recipe_data.crafting_recipes[recipe_name])
+        inputs.append(recipe_info.product.raw)
+        inputs.append(materials_to_string(recipe_info.materials))
+    return inputs
 
 
 if __name__ == "__main__":
@@ -1,4 +1,16 @@
+from typing import Callable, Iterator
+
 from src.ItemService import *
+from src.Infobox_generator.Infobox_template import InfoboxTemplate
+from src.Infobox_generator.Infobox_writer import InfoboxRecord, write_stdout
+
+INFOBOX = InfoboxTemplate(
+    "fish",
+    ["name", "eng", "location", "time", "season", "weather", "difficulty", "behavior", "size", "fl", "sellprice",
+     "edibility", "color"],
+    optional=["fl"],
+    width=10
+)
 
 
 class Fish:
@@ -75,42 +87,45 @@ class Fish:
 
 def generate_infobox() -> None:
     """生成 Infobox fish 并打印"""
-    objects = game_data.objects_data
-    fishes = game_data.fish_data
+    write_stdout(iter_infobox())
 
-    for object_id, object_data in objects.items():
-        item = Object(object_data, object_id)
 
-        if item.get_field("Category") != -4:
+def iter_infobox(item_filter: Callable[[str], bool] | None = None) -> Iterator[InfoboxRecord]:
+    """
+    逐个生成 Infobox fish，返回 (物品 ID, 页面标题, wikitext)
+    :param item_filter: 传入物品 ID，返回 False 时跳过该物品，留空则生成全部物品
+    """
+    objects = game_data.get_objects_frame()
+    fishes = game_data.fish_data
+
+    for row in game_data.iter_rows(objects[objects["category"] == -4]):
+        object_id = row.Index
+        if item_filter is not None and not item_filter(object_id):
             continue
 
-        eng = item.name
-        name = game_data.get_display_name(object_id)
-        sellprice = item.sellprice
-        edibility = item.edibility
-        color = item.color.title()
+        eng = row.name
+        name = row.display_name
+        sellprice = row.price
+        edibility = row.edibility
+        color = row.color.title()
         fish = Fish(fishes[object_id])
 
-        infobox = f"""{name}：\n
-<onlyinclude>{{{{{{{{{{1|Infobox fish}}}}}}
-|name       = {name}
-|eng        = {eng}
-|location   = 
-|time       = {fish.time}
-|season     = {fish.season}
-|weather    = {fish.weather}
-|difficulty = {fish.difficulty}
-|behavior   = {fish.behavior}
-|size       = {fish.size}
-|fl         = {fish.fl}
-|sellprice  = {sellprice}
-|edibility  = {edibility}
-|color      = {color}
-}}}}</onlyinclude>\n\n"""
-
-        infobox = (infobox.replace("|fl         = 0\n", ""))
-
-        print(infobox)
+        infobox = INFOBOX.render({
+            "name": name, "eng": eng, "time": fish.time, "season": fish.season, "weather": fish.weather,
+            "difficulty": fish.difficulty, "behavior": fish.behavior, "size": fish.size,
+            "fl": "" if fish.fl == "0" else fish.fl, "sellprice": sellprice, "edibility": edibility, "color": color
+        }, suffix="\n\n")
+
+        yield object_id, name, infobox
+
+
+def get_inputs(item_id: str) -> list:
+    """
+    获取生成该物品的 Infobox 所需的全部原始数据，用于增量生成时判断物品是否变化
+    :param item_id: 鱼的物品 ID
+    """
+    return [game_data.objects_data.get(item_id), game_data.fish_data.get(item_id),
+            game_data.get_display_name(item_id)]
 
 
 if __name__ == "__main__":
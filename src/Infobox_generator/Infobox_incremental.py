@@ -0,0 +1,96 @@
+"""
+Infobox 的增量生成
+
+每次生成时记录每个物品全部输入数据（物品、作物、商店、配方、本地化文本等）的指纹，保存在 .cache/incremental 目录下。
+再次生成时只输出指纹发生变化的物品，并给出新增、变化和删除的物品清单。
+生成器或生成器共用的模板、数据读取模块的源代码发生变化时，全部物品都会被视为发生变化。
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable
+
+from src.Utilities import FileUtils
+
+# 指纹文件存放的目录
+STATE_DIR = Path(__file__).parent.parent.parent / ".cache" / "incremental"
+
+# 所有生成器共用的源文件，其中任意一个变化时全部物品都需要重新生成
+SRC_DIR = Path(__file__).parent.parent
+SHARED_FILES = [
+    SRC_DIR / "Infobox_generator" / "Infobox_template.py",
+    SRC_DIR / "Infobox_generator" / "Infobox_writer.py",
+    SRC_DIR / "ItemService.py",
+    SRC_DIR / "ShopService.py",
+    SRC_DIR / "RecipeService.py",
+    SRC_DIR / "Utilities.py",
+]
+
+
+class Fingerprints:
+    """
+    记录一个种类的 Infobox 中每个物品的输入指纹，实例本身可以作为生成器的 item_filter 使用
+
+    Attributes:
+        previous: 上次生成时的指纹，物品 ID -> 指纹
+        current: 本次生成时的指纹，物品 ID -> 指纹
+        generator_changed: 生成器或共用模块的源代码是否发生了变化
+    """
+
+    def __init__(self, previous: dict[str, str], get_inputs: Callable[[str], Any], generator_changed: bool = False):
+        self.previous = previous
+        self.current: dict[str, str] = {}
+        self.generator_changed = generator_changed
+        self._get_inputs = get_inputs
+
+    def __call__(self, item_id: str) -> bool:
+        """计算物品的指纹，返回该物品是否需要重新生成"""
+        fingerprint = FileUtils.get_data_hash(self._get_inputs(item_id))
+        self.current[item_id] = fingerprint
+        return self.generator_changed or self.previous.get(item_id) != fingerprint
+
+    def manifest(self) -> dict[str, list[str]]:
+        """
+        比较两次生成的指纹
+        :return: {"added": [...], "changed": [...], "removed": [...]}
+        """
+        added = [item_id for item_id in self.current if item_id not in self.previous]
+        changed = [item_id for item_id, fingerprint in self.current.items()
+                   if item_id in self.previous and (self.generator_changed or self.previous[item_id] != fingerprint)]
+        removed = [item_id for item_id in self.previous if item_id not in self.current]
+        return {"added": added, "changed": changed, "removed": removed}
+
+
+def get_code_hash(generator_file: str | Path) -> str:
+    """
+    计算生成器及 SHARED_FILES 中全部共用源文件的哈希值
+    :param generator_file: 生成器的源文件
+    :return: 全部源文件哈希值的哈希值
+    """
+    return FileUtils.get_data_hash([FileUtils.get_file_hash(file) for file in [generator_file, *SHARED_FILES]])
+
+
+def load_state(family: str, generator_file: str | Path, get_inputs: Callable[[str], Any]) -> Fingerprints:
+    """
+    读取一个种类上次生成时的指纹，若没有记录，则全部物品都会被视为新增
+    :param family: 种类名
+    :param generator_file: 生成器的源文件，与共用源文件一起用于判断生成代码是否变化
+    :param get_inputs: 生成器中获取物品输入数据的函数
+    :return: 用于本次生成的指纹记录
+    """
+    state_file = STATE_DIR / f"{family}.json"
+    if not state_file.exists():
+        return Fingerprints({}, get_inputs)
+    state = FileUtils.read_json(state_file)
+    generator_changed = state.get("generator") != get_code_hash(generator_file)
+    return Fingerprints(state.get("fingerprints", {}), get_inputs, generator_changed)
+
+
+def save_state(family: str, generator_file: str | Path, fingerprints: Fingerprints) -> None:
+    """
+    保存一个种类本次生成时的指纹
+    :param family: 种类名
+    :param generator_file: 生成器的源文件
+    :param fingerprints: 本次生成时记录的指纹
+    """
+    FileUtils.write_json({"generator": get_code_hash(generator_file), "fingerprints": fingerprints.current},
+                         STATE_DIR / f"{family}.json")
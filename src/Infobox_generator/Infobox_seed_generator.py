@@ -1,21 +1,41 @@
+from typing import Callable, Iterator
+
 from src.ShopService import *
 from src.RecipeService import *
+from src.Infobox_generator.Infobox_template import InfoboxTemplate
+from src.Infobox_generator.Infobox_writer import InfoboxRecord, write_stdout
+
+INFOBOX = InfoboxTemplate(
+    "seed",
+    ["name", "eng", "crop", "growth", "season", "xp", "sellprice", "gPrice", "jPrice", "oPrice", "tPrice", "iPrice",
+     "nmday", "raccoon", "otherprice", "artisan", "source", "recipe", "ingredients", "produces"],
+    optional=["xp", "oPrice", "tPrice", "iPrice", "nmday", "raccoon", "artisan", "source", "recipe", "ingredients",
+              "produces"],
+    width=14
+)
 
 
 def generate_infobox() -> None:
     """生成 Infobox seed 并打印"""
-    objects = game_data.objects_data
-    shop_manager = ShopManager()
+    write_stdout(iter_infobox())
+
 
-    for object_id, object_data in objects.items():
-        item = Object(object_data, object_id)
+def iter_infobox(item_filter: Callable[[str], bool] | None = None) -> Iterator[InfoboxRecord]:
+    """
+    逐个生成 Infobox seed，返回 (物品 ID, 页面标题, wikitext)
+    :param item_filter: 传入物品 ID，返回 False 时跳过该物品，留空则生成全部物品
+    """
+    objects = game_data.get_objects_frame()
+    shop_manager = get_shop_manager()
 
-        if item.get_field("Category") != -74:
+    for row in game_data.iter_rows(objects[objects["category"] == -74]):
+        object_id = row.Index
+        if item_filter is not None and not item_filter(object_id):
             continue
 
-        eng = item.name
-        name = game_data.get_display_name(object_id)
-        sellprice = item.sellprice
+        eng = row.name
+        name = row.display_name
+        sellprice = row.price
 
         crop, growth, season, xp = _search_crop(object_id)
         g_price, j_price, o_price, t_price, i_price, raccoon, nmday = _calc_price(object_id, shop_manager)
@@ -25,46 +45,14 @@ def generate_infobox() -> None:
         if name in ["草莓种子"]:
             op = "这里自己写"
 
-        infobox = f"""{name}：\n
-<onlyinclude>{{{{{{{{{{1|Infobox seed}}}}}}
-|name           = {name}
-|eng            = {eng}
-|crop           = {crop}
-|growth         = {growth}
-|season         = {season}
-|xp             = {xp}
-|sellprice      = {sellprice}
-|gPrice         = {g_price}
-|jPrice         = {j_price}
-|oPrice         = {o_price}
-|tPrice         = {t_price}
-|iPrice         = {i_price}
-|nmday          = {nmday}
-|raccoon        = {raccoon}
-|otherprice     = {op}
-|artisan        = {artisan}
-|source         = {source}
-|recipe         = {recipe}
-|ingredients    = {ingredients}
-|produces       = {produces}
-}}}}</onlyinclude>
-'''{name}'''是一种种子，播种并生长 {growth} 成熟后可以获得[[???]]。\n\n"""
-
-        infobox = (infobox
-                   .replace("|xp             = \n", "")
-                   .replace("|oPrice         = \n", "")
-                   .replace("|tPrice         = \n", "")
-                   .replace("|iPrice         = \n", "")
-                   .replace("|nmday          = \n", "")
-                   .replace("|raccoon        = \n", "")
-                   .replace("|op             = \n", "")
-                   .replace("|artisan        = \n", "")
-                   .replace("|source         = \n", "")
-                   .replace("|recipe         = \n", "")
-                   .replace("|ingredients    = \n", "")
-                   .replace("|produces       = \n", ""))
-
-        print(infobox)
+        infobox = INFOBOX.render({
+            "name": name, "eng": eng, "crop": crop, "growth": growth, "season": season, "xp": xp,
+            "sellprice": sellprice, "gPrice": g_price, "jPrice": j_price, "oPrice": o_price, "tPrice": t_price,
+            "iPrice": i_price, "nmday": nmday, "raccoon": raccoon, "otherprice": op, "artisan": artisan,
+            "source": source, "recipe": recipe, "ingredients": ingredients, "produces": produces
+        }, suffix=f"\n'''{name}'''是一种种子，播种并生长 {growth} 成熟后可以获得[[???]]。\n\n")
+
+        yield object_id, name, infobox
 
 
 def _search_crop(seed_id: str) -> tuple[str, str, str, str]:
@@ -95,8 +83,7 @@ def _search_crop(seed_id: str) -> tuple[str, str, str, str]:
     if _tag == "c":
         harvest = game_data.try_get_object(harvest_id)
         growth = str(crop.growth) + " 天"
-        sellprice = harvest.sellprice
-        xp = f"{{{{Xp|{Crop.get_xp(sellprice)}|farm}}}}"
+        xp = f"{{{{Xp|{game_data.get_objects_frame().at[harvest_id, 'xp']}|farm}}}}"
     # 果树的生长时间和经验（定死）
     elif _tag == "f":
         harvest = game_data.try_get_object(harvest_id)
@@ -183,5 +170,30 @@ def _get_recipe_data(seed_id: str) -> tuple[str, str, str, str, str]:
     return artisan, source, recipe, ingredients, produces
 
 
+def get_inputs(item_id: str) -> list:
+    """
+    获取生成该物品的 Infobox 所需的全部原始数据，用于增量生成时判断物品是否变化
+    :param item_id: 种子的物品 ID
+    """
+    shop_manager = get_shop_manager()
+    crop_data = game_data.crops_data.get(item_id) or game_data.fruit_trees_data.get(item_id)
+    harvest_id = None
+    if item_id in game_data.crops_data:
+        harvest_id = Crop(crop_data).harvest
+    elif item_id in game_data.fruit_trees_data:
+        harvest_id = FruitTree(crop_data).harvest
+
+    inputs: list = [game_data.objects_data.get(item_id), game_data.get_display_name(item_id), crop_data,
+                    game_data.objects_data.get(harvest_id)]
+    for shop in ("seed_shop", "joja_mart", "oasis", "traveler", "island_trade", "raccoon_shop",
+                 "nmday1", "nmday2", "nmday3"):
+        for g in getattr(shop_manager, shop).get_all_goods(item_id):
+            inputs.append([shop, g.raw, g.price])
+    for craft_recipe in recipe_data.crafting_recipe_objects.values():
+        if craft_recipe.product.itemID == item_id:
+            inputs.append(materials_to_string(craft_recipe.materials))
+    return inputs
+
+
 if __name__ == "__main__":
     generate_infobox()
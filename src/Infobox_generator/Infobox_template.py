@@ -0,0 +1,66 @@
+"""
+Infobox 的渲染模板
+
+每种 Infobox 的参数只需声明一次：参数名、对齐宽度，以及值为空时是否省略该参数。
+声明时会预先生成每个参数的前缀（例如 “|name       = ”），渲染时逐个参数拼接，一次完成，
+不需要在生成后再用 replace 删除空参数。
+
+使用方式:
+INFOBOX = InfoboxTemplate("fish", ["name", "eng", "fl"], optional=["fl"], width=10)
+wikitext = INFOBOX.render({"name": "鲤鱼", "eng": "Carp", "fl": ""}, suffix="\n\n")
+"""
+from __future__ import annotations
+from typing import Any, Iterable, Optional
+
+
+class InfoboxTemplate:
+    """
+    Infobox 的渲染模板
+
+    Attributes:
+        family: Infobox 的类型，例如 fish，对应模板 Infobox fish
+        params: (参数名, 参数前缀, 值为空时是否省略)，按输出顺序排列
+    """
+
+    __slots__ = ("family", "params")
+
+    def __init__(self, family: str, fields: Iterable[str], optional: Iterable[str] = (),
+                 width: Optional[int] = None) -> None:
+        """
+        :param family: Infobox 的类型
+        :param fields: 参数名，按输出顺序排列
+        :param optional: 值为空时省略的参数
+        :param width: 参数名的对齐宽度，留空则为最长的参数名长度
+        """
+        fields = list(fields)
+        optional = set(optional)
+        unknown = optional.difference(fields)
+        if unknown:
+            raise ValueError(f"optional params {sorted(unknown)} are not declared in fields!")
+        if width is None:
+            width = max(map(len, fields), default=0)
+
+        self.family = family
+        self.params: tuple[tuple[str, str, bool], ...] = tuple(
+            (field, f"|{field:<{width}} = ", field in optional) for field in fields
+        )
+
+    def render(self, values: dict[str, Any], family: Optional[str] = None, suffix: str = "") -> str:
+        """
+        渲染 Infobox
+        :param values: 参数名 -> 参数值，未给出的参数视为空
+        :param family: Infobox 的类型，留空则使用模板声明时的类型，用于 vegetable/SVE 等变体
+        :param suffix: 追加在 </onlyinclude> 之后的文本
+        :return: wikitext
+        """
+        parts = [f"<onlyinclude>{{{{{{{{{{1|Infobox {family or self.family}}}}}}}\n"]
+        for name, prefix, optional in self.params:
+            value = format(values.get(name, ""))
+            if optional and value == "":
+                continue
+            parts.append(prefix)
+            parts.append(value)
+            parts.append("\n")
+        parts.append("}}</onlyinclude>")
+        parts.append(suffix)
+        return "".join(parts)
@@ -1,90 +1,88 @@
+from typing import Callable, Iterator
+
 from src.ItemService import *
+from src.Infobox_generator.Infobox_template import InfoboxTemplate
+from src.Infobox_generator.Infobox_writer import InfoboxRecord, write_stdout
+
+# vegetable、fruit、flower 和 forage 的参数相同，渲染时再指定具体的类型
+INFOBOX = InfoboxTemplate(
+    "vegetable",
+    ["name", "eng", "source", "seed", "growth", "season", "xp", "sellprice", "edibility", "color", "tag"],
+    optional=["xp"],
+    width=11
+)
 
 
 def generate_infobox(category: Literal["vegetable", "fruit", "flower", "forage"]) -> None:
     """生成 Infobox vegetable/fruit/flower/forage 并打印"""
-    objects = game_data.objects_data
-
-    for object_id, object_data in objects.items():
-        item = Object(object_data, object_id)
-
-        match item.get_field("Category"):
-            case -75 if category == "vegetable":
-                _category = "vegetable"
-            case -79 if category == "fruit":
-                _category = "fruit"
-            case -80 if category == "flower":
-                _category = "flower"
-            case -81 if category == "forage":
-                _category = "forage"
-            case -23 if category == "forage":
-                _category = "forage"
-            case _:
-                continue
-
-        eng = item.name
-        name = ""
-        match game_data.namespace:
-            case "SVE":
-                name = game_data.get_display_name(object_id)
-                _category += "/SVE"
-            case "Vanilla":
-                name = game_data.get_display_name(object_id)
-        sellprice = item.sellprice
-        edibility = item.edibility
-        color = item.color
-        xp = Crop.get_xp(sellprice)
-
-        source, seed, growth, season, tag = _search_crop(category, object_id, item, name)
-
-        infobox = f"""{name}：\n
-<onlyinclude>{{{{{{{{{{1|Infobox {_category}}}}}}}
-|name        = {name}
-|eng         = {eng}
-|source      = {source}
-|seed        = {seed}
-|growth      = {growth}
-|season      = {season}"""
+    write_stdout(iter_infobox(category))
 
+
+def iter_infobox(category: Literal["vegetable", "fruit", "flower", "forage"],
+                 item_filter: Callable[[str], bool] | None = None) -> Iterator[InfoboxRecord]:
+    """
+    逐个生成 Infobox vegetable/fruit/flower/forage，返回 (物品 ID, 页面标题, wikitext)
+    :param item_filter: 传入物品 ID，返回 False 时跳过该物品，留空则生成全部物品
+    """
+    objects = game_data.get_objects_frame()
+    match category:
+        case "vegetable":
+            categories = [-75]
+        case "fruit":
+            categories = [-79]
+        case "flower":
+            categories = [-80]
+        case "forage":
+            categories = [-81, -23]
+        case _:
+            return
+
+    for row in game_data.iter_rows(objects[objects["category"].isin(categories)]):
+        object_id = row.Index
+        if item_filter is not None and not item_filter(object_id):
+            continue
+
+        _category = category
+
+        eng = row.name
+        name = row.display_name
+        if game_data.namespace == "SVE":
+            _category += "/SVE"
+        sellprice = row.price
+        edibility = row.edibility
+        color = row.color
+        xp = row.xp
+
+        source, seed, growth, season, tag = _search_crop(category, object_id, row, name)
+
+        xp_text = ""
         if tag == "" and category in ["vegetable", "fruit", "flower"]:
-            infobox = infobox + f"""
-|xp          = {{{{Xp|{xp}|farm}}}}"""
+            xp_text = f"{{{{Xp|{xp}|farm}}}}"
         elif tag == "Forage" or category == "forage":
             if len(season) > 1 and season[1] == '季':
-                infobox = infobox + f"""
-|xp          = <nowiki />
-*{season}种子：{{Xp|3|采集}}与 {{Xp|2|耕种}}
-*采集：{{Xp|7|采集}}"""
+                xp_text = f"<nowiki />\n*{season}种子：{{Xp|3|采集}}与 {{Xp|2|耕种}}\n*采集：{{Xp|7|采集}}"
             else:
-                infobox = infobox + f"""
-|xp          = {{{{Xp|7|forage}}}}"""
-
-        infobox = infobox + f"""
-|sellprice   = {sellprice}
-|edibility   = {edibility}
-|color       = {color}
-|tag         = {tag}
-}}}}</onlyinclude>\n\n"""
+                xp_text = "{{Xp|7|forage}}"
 
-        if category == "forage":
-            infobox.replace("|seed        = \n|growth      = {growth}\n", "")
+        infobox = INFOBOX.render({
+            "name": name, "eng": eng, "source": source, "seed": seed, "growth": growth, "season": season,
+            "xp": xp_text, "sellprice": sellprice, "edibility": edibility, "color": color, "tag": tag
+        }, family=_category, suffix="\n\n")
 
-        print(infobox)
+        yield object_id, name, infobox
 
 
-def _search_crop(category: str, object_id: str, item: Object, name: str) -> tuple[str, str, str, str, str]:
+def _search_crop(category: str, object_id: str, item: Any, name: str) -> tuple[str, str, str, str, str]:
     """
     检查游戏数据，尝试寻找该物品的种子、生长时间、生长季节
+    :param item: 物品在 game_data.get_objects_frame() 中对应的一行
     :return: source, seed, growth, season, tag
     """
-    crops = game_data.crops_data
-    trees = game_data.fruit_trees_data
-
     # 先检查作物列表
     if category != "forage":
-        for seed_id, crop_data in crops.items():
-            crop = Crop(crop_data)
-            if crop.harvest == object_id and seed_id not in ["495", "496", "497", "498"]:
+        for seed_id in game_data.get_seeds(object_id):
+            if seed_id not in ["495", "496", "497", "498"]:
+                crop = Crop(game_data.crops_data[seed_id])
                 seed = game_data.get_name(seed_id)
                 seed = f"{{{{Name|{seed}}}}}"
                 growth = str(crop.growth) + " 天"
@@ -94,17 +92,16 @@ def _search_crop(category: str, object_id: str, item: Object, name: str) -> tupl
 
     # 然后检查果树列表
     if category == "fruit":
-        for seed_id, tree_data in trees.items():
-            tree = FruitTree(tree_data)
-            if tree.harvest == object_id or tree.harvest == "(O)" + object_id:
-                seed = game_data.get_name(seed_id)
-                seed = f"{{{{Name|{seed}}}}}"
-                growth = "28 天"
-                season = tree.seasons
-                source = f"[[{name}树]]"
-                if object_id not in ["91", "834"]:
-                    source += " • [[山洞#果蝠|山洞（果蝠）]]"
-                return source, seed, growth, season, "Tree"
+        for seed_id in game_data.get_saplings(object_id):
+            tree = FruitTree(game_data.fruit_trees_data[seed_id])
+            seed = game_data.get_name(seed_id)
+            seed = f"{{{{Name|{seed}}}}}"
+            growth = "28 天"
+            season = tree.seasons
+            source = f"[[{name}树]]"
+            if object_id not in ["91", "834"]:
+                source += " • [[山洞#果蝠|山洞（果蝠）]]"
+            return source, seed, growth, season, "Tree"
 
     # 再检查野生种子
     if category != "vegetable":
@@ -128,7 +125,7 @@ def _search_crop(category: str, object_id: str, item: Object, name: str) -> tupl
 
     tag = "Forage"
     if category == "forage":
-        if "edible_mushroom" in item.get_field("ContextTags"):
+        if "edible_mushroom" in (item.context_tags or ()):
             tag = "Mushroom"
         elif item.edibility > 0:
             tag = "Vegetable"
@@ -140,6 +137,19 @@ def _search_crop(category: str, object_id: str, item: Object, name: str) -> tupl
     return "[[采集]]", "", "", "", tag
 
 
+def get_inputs(item_id: str) -> list:
+    """
+    获取生成该物品的 Infobox 所需的全部原始数据，用于增量生成时判断物品是否变化
+    :param item_id: 物品 ID
+    """
+    inputs: list = [game_data.objects_data.get(item_id), game_data.get_display_name(item_id)]
+    for seed_id in game_data.get_seeds(item_id):
+        inputs.append([seed_id, game_data.get_name(seed_id), game_data.crops_data[seed_id]])
+    for sapling_id in game_data.get_saplings(item_id):
+        inputs.append([sapling_id, game_data.get_name(sapling_id), game_data.fruit_trees_data[sapling_id]])
+    return inputs
+
+
 if __name__ == "__main__":
     game_data = GameData()   # 若需要更改命名空间，请在这里填写，留空则代表使用原版
 
@@ -1,4 +1,15 @@
+from typing import Callable, Iterator
+
 from src.ShopService import *
+from src.Infobox_generator.Infobox_template import InfoboxTemplate
+from src.Infobox_generator.Infobox_writer import InfoboxRecord
+
+INFOBOX = InfoboxTemplate(
+    "weapon",
+    ["name", "eng", "source", "type", "level", "damage", "csc", "csm", "price", "sellprice", "stats"],
+    optional=["csc", "csm", "stats"],
+    width=15
+)
 
 
 def get_infobox(weapon_id, weapon_data) -> str:
@@ -14,33 +25,38 @@ def get_infobox(weapon_id, weapon_data) -> str:
     sellprice: int = weapon_data.get("SellPrice")
     stats: str = stats_to_string(weapon_data.get("Statistics"))
 
-    infobox = f"""<onlyinclude>{{{{{{{{{{1|Infobox weapon}}}}}}
-|name            = {name}
-|eng             = {eng}
-|source          = 
-|type            = {wtype}
-|level           = {level}
-|damage          = {damage}
-|csc             = {csc}
-|csm             = {csm}
-|price           = {price}
-|sellprice       = {sellprice}
-|stats           = {stats}
-}}}}</onlyinclude>
-"""
-
-    return (infobox
-            .replace("|csc             = \n", "")
-            .replace("|csm             = \n", "")
-            .replace("|stats           = \n", ""))
+    return INFOBOX.render({
+        "name": name, "eng": eng, "type": wtype, "level": level, "damage": damage, "csc": csc, "csm": csm,
+        "price": price, "sellprice": sellprice, "stats": stats
+    }, suffix="\n")
+
+
+def iter_infobox(item_filter: Callable[[str], bool] | None = None) -> Iterator[InfoboxRecord]:
+    """
+    逐个生成 Infobox weapon，返回 (武器 ID, 页面标题, wikitext)
+    :param item_filter: 传入武器 ID，返回 False 时跳过该武器，留空则生成全部武器
+    """
+    for weapon_id, weapon_data in game_data.weapon_data.items():
+        if item_filter is not None and not item_filter(weapon_id):
+            continue
+        yield weapon_id, weapon_data.get("DisplayName"), get_infobox(weapon_id, weapon_data)
+
+
+def get_inputs(item_id: str) -> list:
+    """
+    获取生成该武器的 Infobox 所需的全部原始数据，用于增量生成时判断武器是否变化
+    :param item_id: 武器 ID
+    """
+    goods = get_shop_manager().adventure_guild.get_all_goods(item_id)
+    return [game_data.weapon_data.get(item_id), [[g.raw, g.price] for g in goods]]
 
 
 def get_shop_price(code: str) -> int | None:
-    shop: ShopData = ShopManager().adventure_guild
-    for good in shop.goods:
-        if good.item_id == code:
-            return good.price
-    return -1
+    shop: ShopData = get_shop_manager().adventure_guild
+    goods = shop.try_get_goods(code)
+    if goods is None:
+        return -1
+    return goods.price
 
 
 def stats_to_string(stats: dict[str, str | None]) -> str:
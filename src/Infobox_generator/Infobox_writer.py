@@ -0,0 +1,73 @@
+"""
+Infobox 的输出工具
+
+各生成器的 iter_infobox 逐个返回 (物品 ID, 页面标题, wikitext)，本模块负责将其写入不同的目标：
+- write_stdout: 打印到标准输出，格式与原先的 generate_infobox 一致；
+- write_pages: 每个页面写入一个单独的文件；
+- write_jsonl: 全部页面写入同一个 JSONL 文件，每行一个页面。
+"""
+from __future__ import annotations
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Union
+
+# 生成器返回的单条记录：物品 ID, 页面标题, wikitext
+InfoboxRecord = tuple[str, str, str]
+
+
+def write_stdout(records: Iterable[InfoboxRecord]) -> int:
+    """
+    将 Infobox 逐个打印到标准输出
+    :param records: 生成器返回的记录
+    :return: 输出的页面数量
+    """
+    count = 0
+    for _, title, wikitext in records:
+        print(f"{title}：\n\n{wikitext}")
+        count += 1
+    return count
+
+
+def write_pages(records: Iterable[InfoboxRecord], output_dir: Union[str, Path], suffix: str = ".wiki") -> int:
+    """
+    将每个 Infobox 写入单独的文件，文件名为页面标题，标题重复时在文件名后附加物品 ID
+    :param records: 生成器返回的记录
+    :param output_dir: 输出目录
+    :param suffix: 文件后缀名
+    :return: 输出的页面数量
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    used: set[str] = set()
+    count = 0
+    for item_id, title, wikitext in records:
+        filename = _safe_filename(title)
+        if filename in used:
+            filename = _safe_filename(f"{title} ({item_id})")
+        used.add(filename)
+        (output_dir / f"{filename}{suffix}").write_text(wikitext, encoding="utf-8")
+        count += 1
+    return count
+
+
+def write_jsonl(records: Iterable[InfoboxRecord], filepath: Union[str, Path]) -> int:
+    """
+    将全部 Infobox 写入同一个 JSONL 文件，每行的格式为 {"id": ..., "title": ..., "text": ...}
+    :param records: 生成器返回的记录
+    :param filepath: 输出文件路径
+    :return: 输出的页面数量
+    """
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with filepath.open("w", encoding="utf-8") as f:
+        for item_id, title, wikitext in records:
+            f.write(json.dumps({"id": item_id, "title": title, "text": wikitext}, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _safe_filename(title: str) -> str:
+    """将页面标题中不能用于文件名的字符替换为下划线"""
+    return re.sub(r'[\\/:*?"<>|]', "_", title)
@@ -0,0 +1,209 @@
+"""
+一次性生成多个种类的 Infobox
+
+用法:
+    python -m src.Infobox_generator all                           生成全部种类并打印
+    python -m src.Infobox_generator fish seed --output-dir out    仅生成鱼和种子，每个页面写入一个文件
+    python -m src.Infobox_generator all --jsonl out               每个种类写入一个 JSONL 文件
+    python -m src.Infobox_generator all --incremental             只输出输入数据发生变化的物品
+
+游戏数据、配方和商店只在主进程中读取一次，之后每个种类的物品会被分为若干块，分配到进程池（或线程池）中并行生成，
+完成后按原来的顺序合并，并输出每个种类的页面数量和耗时。增量生成时还会输出新增、变化和删除的物品清单。
+
+进程池使用 fork 启动工作进程，工作进程直接继承主进程中已读取的数据。不支持 fork 的平台（Windows）上，
+spawn 启动的工作进程需要重新导入模块并读取全部数据，因此会自动改用线程池。
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Iterator, Optional
+
+from src.Infobox_generator import (Infobox_craft_generator, Infobox_fish_generator, Infobox_seed_generator,
+                                   Infobox_vfff_generator, Infobox_weapon_generator)
+from src.Infobox_generator.Infobox_incremental import STATE_DIR, Fingerprints, load_state, save_state
+from src.Infobox_generator.Infobox_writer import InfoboxRecord, write_jsonl, write_pages, write_stdout
+from src.ShopService import game_data, get_shop_manager
+from src.Utilities import FileUtils
+
+# 种类名 -> (生成器模块, 生成该种类 Infobox 的函数)
+FAMILIES: dict[str, tuple[ModuleType, Callable[..., Iterator[InfoboxRecord]]]] = {
+    "fish": (Infobox_fish_generator, Infobox_fish_generator.iter_infobox),
+    "seed": (Infobox_seed_generator, Infobox_seed_generator.iter_infobox),
+    "craft": (Infobox_craft_generator, Infobox_craft_generator.iter_infobox),
+    "vegetable": (Infobox_vfff_generator, partial(Infobox_vfff_generator.iter_infobox, "vegetable")),
+    "fruit": (Infobox_vfff_generator, partial(Infobox_vfff_generator.iter_infobox, "fruit")),
+    "flower": (Infobox_vfff_generator, partial(Infobox_vfff_generator.iter_infobox, "flower")),
+    "forage": (Infobox_vfff_generator, partial(Infobox_vfff_generator.iter_infobox, "forage")),
+    "weapon": (Infobox_weapon_generator, Infobox_weapon_generator.iter_infobox),
+}
+
+
+def preload() -> None:
+    """读取全部游戏数据并构建所有生成器共用的缓存，使工作进程（线程）无需重复读取"""
+    game_data.preload()
+    game_data.get_objects_frame()
+    get_shop_manager().preload()
+
+
+class ItemChunk:
+    """
+    将生成器遍历到的物品按出现顺序轮流分配到各个分块，实例本身可以作为生成器的 item_filter 使用。
+    同一种类的各个分块遍历物品的顺序相同，因此每个物品恰好属于一个分块，合并时按序号即可恢复原来的顺序
+
+    Attributes:
+        index: 当前分块的序号
+        count: 分块总数
+        inner: 分块内的物品还需要通过的 item_filter，例如增量生成时的 Fingerprints
+        order: 属于当前分块的物品 ID -> 物品在生成器中的序号
+    """
+
+    def __init__(self, index: int, count: int, inner: Optional[Callable[[str], bool]] = None) -> None:
+        self.index = index
+        self.count = count
+        self.inner = inner
+        self.order: dict[str, int] = {}
+        self._seen = 0
+
+    def __call__(self, item_id: str) -> bool:
+        ordinal = self._seen
+        self._seen += 1
+        if ordinal % self.count != self.index:
+            return False
+        self.order.setdefault(item_id, ordinal)
+        return self.inner is None or self.inner(item_id)
+
+
+def render(family: str, chunk: int = 0, chunks: int = 1,
+           incremental: bool = False) -> tuple[str, list[tuple[int, InfoboxRecord]], dict[str, int], float,
+                                               Fingerprints | None]:
+    """
+    生成一个种类中属于指定分块的 Infobox
+    :param family: 种类名
+    :param chunk: 分块序号
+    :param chunks: 该种类的分块总数
+    :param incremental: 是否只生成输入数据发生变化的物品
+    :return: 种类名，(序号, 生成的记录)，分块内的物品 ID -> 序号，耗时（毫秒），本次记录的指纹（仅增量生成时）
+    """
+    start = time.perf_counter()
+    module, iter_infobox = FAMILIES[family]
+    fingerprints = load_state(family, module.__file__, module.get_inputs) if incremental else None
+    item_filter = ItemChunk(chunk, chunks, fingerprints)
+    records = [(item_filter.order[record[0]], record) for record in iter_infobox(item_filter=item_filter)]
+    return family, records, item_filter.order, (time.perf_counter() - start) * 1000, fingerprints
+
+
+def run(families: list[str], executor: Executor, incremental: bool = False,
+        chunks: int = 1) -> tuple[dict[str, list[InfoboxRecord]], dict[str, Fingerprints]]:
+    """
+    将每个种类的物品分为 chunks 块并行生成，按原来的顺序合并后打印每个种类的耗时。
+    本次的指纹不会在这里保存，调用方应在写出该种类的页面之后再调用 save_state，避免输出失败时丢失变化
+    :param families: 需要生成的种类
+    :param executor: 用于并行生成的进程池或线程池
+    :param incremental: 是否只生成输入数据发生变化的物品
+    :param chunks: 每个种类的分块数量
+    :return: 种类名 -> 生成的记录，种类名 -> 本次记录的指纹（仅增量生成时），均按 families 中的顺序排列
+    """
+    tasks = [(family, chunk) for family in families for chunk in range(chunks)]
+    parts = executor.map(render, [family for family, _ in tasks], [chunk for _, chunk in tasks],
+                         [chunks] * len(tasks), [incremental] * len(tasks))
+
+    results: dict[str, list[InfoboxRecord]] = {}
+    family_fingerprints: dict[str, Fingerprints] = {}
+    for family in families:
+        records: list[tuple[int, InfoboxRecord]] = []
+        order: dict[str, int] = {}
+        elapsed_ms = 0.0
+        fingerprints: Optional[Fingerprints] = None
+        # executor.map 按提交顺序返回结果，同一种类的分块是连续的
+        for _, part_records, part_order, part_ms, part_fingerprints in islice(parts, chunks):
+            records.extend(part_records)
+            order.update(part_order)
+            elapsed_ms += part_ms
+            if part_fingerprints is not None:
+                if fingerprints is None:
+                    fingerprints = part_fingerprints
+                else:
+                    fingerprints.current.update(part_fingerprints.current)
+
+        records.sort(key=lambda item: item[0])
+        results[family] = [record for _, record in records]
+        message = f"[{family}] {len(records)} 个页面，{chunks} 个分块共耗时 {elapsed_ms:.2f}ms"
+        if fingerprints is not None:
+            fingerprints.current = dict(sorted(fingerprints.current.items(), key=lambda item: order[item[0]]))
+            family_fingerprints[family] = fingerprints
+            manifest = fingerprints.manifest()
+            message += f"，新增 {len(manifest['added'])}，变化 {len(manifest['changed'])}，删除 {len(manifest['removed'])}"
+        print(message, file=sys.stderr)
+    return results, family_fingerprints
+
+
+def make_executor(workers: Optional[int], threads: bool) -> Executor:
+    """
+    创建用于并行生成的执行器
+    :param workers: 并行的进程（线程）数量
+    :param threads: 是否使用线程池，不支持 fork 的平台上总是使用线程池
+    """
+    if threads or "fork" not in multiprocessing.get_all_start_methods():
+        return ThreadPoolExecutor(max_workers=workers)
+    # 显式使用 fork，macOS 上默认的 spawn 同样会在每个工作进程中重新读取数据
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="一次性生成多个种类的 Infobox")
+    parser.add_argument("families", nargs="+", choices=["all", *FAMILIES], help="需要生成的种类，all 表示全部")
+    parser.add_argument("--workers", type=int, default=None, help="并行的进程（线程）数量，默认为 CPU 核心数")
+    parser.add_argument("--chunks", type=int, default=None, help="每个种类的物品分为几块并行生成，默认与 workers 相同")
+    parser.add_argument("--threads", action="store_true", help="使用线程池代替进程池，不支持 fork 的平台上总是使用线程池")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--output-dir", type=Path, help="每个页面写入一个文件，按种类分目录存放")
+    output.add_argument("--jsonl", type=Path, help="每个种类写入一个 JSONL 文件，存放在该目录下")
+    parser.add_argument("--incremental", action="store_true", help="只输出输入数据发生变化的物品")
+    parser.add_argument("--manifest", type=Path, default=STATE_DIR / "manifest.json",
+                        help="增量生成时物品变化清单的保存路径")
+    args = parser.parse_args()
+
+    families = list(FAMILIES) if "all" in args.families else list(dict.fromkeys(args.families))
+
+    start = time.perf_counter()
+    preload()
+    print(f"[加载] 耗时 {(time.perf_counter() - start) * 1000:.2f}ms", file=sys.stderr)
+
+    workers = args.workers or os.cpu_count() or 1
+    chunks = args.chunks or workers
+
+    # 生成过程中的提示信息输出到标准错误，避免与生成的页面混在一起
+    with contextlib.redirect_stdout(sys.stderr), make_executor(workers, args.threads) as executor:
+        results, family_fingerprints = run(families, executor, args.incremental, chunks)
+
+    manifests: dict[str, dict[str, list[str]]] = {}
+    for family, records in results.items():
+        if args.output_dir is not None:
+            write_pages(records, args.output_dir / family)
+        elif args.jsonl is not None:
+            write_jsonl(records, args.jsonl / f"{family}.jsonl")
+        else:
+            write_stdout(records)
+        # 该种类的页面写出后才保存指纹，写出失败时下次仍会重新生成这些物品
+        if family in family_fingerprints:
+            module, _ = FAMILIES[family]
+            save_state(family, module.__file__, family_fingerprints[family])
+            manifests[family] = family_fingerprints[family].manifest()
+
+    if args.incremental:
+        FileUtils.write_json(manifests, args.manifest)
+        print(f"[清单] 已保存至 {args.manifest}", file=sys.stderr)
+
+    print(f"[总计] 耗时 {(time.perf_counter() - start) * 1000:.2f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,52 @@ from __future__ import annotations
 import math
 import re
 from pathlib import Path
-from typing import Any, Literal
-
-from src.Utilities import FileUtils
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Literal
+
+from src.Utilities import FileUtils, JsonCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# 各命名空间下 GameData 属性 -> JSON 文件名的映射
+_JSON_FILES: dict[str, dict[str, str]] = {
+    "Vanilla": {
+        "objects_data": "Objects.json",
+        "objects_zh_cn": "Objects.zh-CN.json",
+        "bigcraftables_data": "BigCraftables.json",
+        "bigcraftables_zh_cn": "BigCraftables.zh-CN.json",
+        "crops_data": "Crops.json",
+        "fruit_trees_data": "FruitTrees.json",
+        "shops_data": "Shops.json",
+        "fish_data": "Fish.json",
+        "weapon_data": "Weapons.json",
+        "item_id": "itemID.json",
+    },
+    "SVE": {
+        "objects_data": "Objects.json",
+        "objects_zh_cn": "zh.json",
+        "bigcraftables_data": "BigCraftables.json",
+        "bigcraftables_zh_cn": "zh.json",
+        "crops_data": "Crops.json",
+        "fruit_trees_data": "FruitTrees.json",
+        "shops_data": "Shops.json",
+    },
+}
+
+# 解析结果的二进制缓存，位于项目根目录下的 .cache 文件夹
+json_cache = JsonCache(Path(__file__).parent.parent / ".cache")
+
+# 各命名空间下 JSON 文件所在的目录
+_JSON_DIRS: dict[str, Path] = {
+    "Vanilla": Path(__file__).parent.parent / "json",
+    "SVE": Path(__file__).parent.parent / "json_sve",
+}
 
 
 class GameData:
     """
-    存储游戏数据的类
+    存储游戏数据的类，各项数据均在首次访问时才读取对应的 JSON 文件，之后缓存在实例中
 
     Attributes:
         objects_data: 解析 Object.json 得到的字典
@@ -22,50 +60,302 @@ class GameData:
         fish_data: 解析 Fish.json 得到的字典
         weapon_data: 解析 Weapons.json 得到的字典
         namespace: 当前位于哪个空间，Vanilla 为原版，或 SVE
+        json_path: JSON 文件所在的目录，默认为命名空间对应的 json 或 json_sve 目录
+        use_cache: 是否使用 .cache 目录下的二进制缓存读取 JSON 文件
+        version: 数据版本号，每次调用 reload 后加一，用于判断依赖这些数据的缓存是否失效
     """
 
-    def __init__(self, namespace: Literal["Vanilla", "SVE"] = "Vanilla") -> None:
-        self.objects_data: dict[str, dict] = {}
-        self.objects_zh_cn: dict[str, str] = {}
-        self.bigcraftables_data: dict[str, dict] = {}
-        self.bigcraftables_zh_cn: dict[str, str] = {}
-        self.crops_data: dict[str, dict] = {}
-        self.fruit_trees_data: dict[str, dict] = {}
-        self.shops_data: dict[str, dict] = {}
-        self.fish_data: dict[str, str] = {}
-        self.weapon_data: dict[str, dict] = {}
-        self.item_id: dict[str, str] = {}
+    objects_data: dict[str, dict]
+    objects_zh_cn: dict[str, str]
+    bigcraftables_data: dict[str, dict]
+    bigcraftables_zh_cn: dict[str, str]
+    crops_data: dict[str, dict]
+    fruit_trees_data: dict[str, dict]
+    shops_data: dict[str, dict]
+    fish_data: dict[str, str]
+    weapon_data: dict[str, dict]
+    item_id: dict[str, str]
+
+    def __init__(self, namespace: Literal["Vanilla", "SVE"] = "Vanilla", use_cache: bool = True,
+                 json_path: str | Path | None = None) -> None:
+        if namespace not in _JSON_FILES:
+            raise ValueError("不合法的命名空间！")
+
         self.namespace = namespace
+        self.use_cache = use_cache
+        self.version = 0
+        self.json_path: Path = _JSON_DIRS[namespace] if json_path is None else Path(json_path)
+        self._files: dict[str, str] = _JSON_FILES[namespace]
+        self._raw_cache: dict[str, dict] = {}  # 文件名 -> 解析结果，避免同一文件被重复解析
+        self._indexes: dict[str, Any] = {}  # 索引名 -> 反向索引或列式视图，首次使用时构建
+
+    def __getattr__(self, attr: str) -> Any:
+        """
+        仅在实例中不存在该属性时调用，用于按需读取 JSON 文件
+        :param attr: 需要获取的属性名
+        :return: 解析对应 JSON 文件得到的字典
+        :exception AttributeError: 不存在该属性
+        """
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        # 当前命名空间下没有对应文件的数据（例如 SVE 的 fish_data），与原版保持一致返回空字典
+        if attr not in self._files:
+            if attr in _JSON_FILES["Vanilla"]:
+                data: dict = {}
+                setattr(self, attr, data)
+                return data
+            raise AttributeError(f"'GameData' object has no attribute '{attr}'")
+
+        filename = self._files[attr]
+        if filename not in self._raw_cache:
+            filepath = self.json_path / filename
+            self._raw_cache[filename] = json_cache.read(filepath) if self.use_cache else FileUtils.read_json(filepath)
+        data = self._raw_cache[filename]
+        setattr(self, attr, data)
+        return data
+
+    def preload(self) -> None:
+        """
+        立即读取当前命名空间下的全部数据文件
+        """
+        for attr in self._files:
+            getattr(self, attr)
+
+    def reload(self) -> None:
+        """
+        丢弃所有已读取的数据，下次访问时重新读取 JSON 文件
+        """
+        for attr in _JSON_FILES["Vanilla"]:
+            self.__dict__.pop(attr, None)
+        self._raw_cache.clear()
+        self._indexes.clear()
+        self.version += 1
 
-        # 根据命名空间，获取相关原始数据
-        match namespace:
-            # 读取原版 JSON 文件
+    def _get_index(self, name: str) -> dict:
+        """
+        获取指定的反向索引，若尚未构建则先构建
+        :param name: 索引名，对应 _build_{name} 方法
+        :return: 索引字典
+        """
+        if name not in self._indexes:
+            self._indexes[name] = getattr(self, f"_build_{name}")()
+        return self._indexes[name]
+
+    def _build_seeds(self) -> dict[str, list[str]]:
+        """收获物品 ID -> 作物种子 ID 列表"""
+        index: dict[str, list[str]] = {}
+        for seed_id, crop_data in self.crops_data.items():
+            index.setdefault(Object.trim(crop_data.get("HarvestItemId")), []).append(seed_id)
+        return index
+
+    def _build_saplings(self) -> dict[str, list[str]]:
+        """果实 ID -> 果树树苗 ID 列表"""
+        index: dict[str, list[str]] = {}
+        for sapling_id, tree_data in self.fruit_trees_data.items():
+            index.setdefault(Object.trim(tree_data.get("Fruit")[0].get("ItemId")), []).append(sapling_id)
+        return index
+
+    def _build_categories(self) -> dict[int, list[str]]:
+        """物品类型值 -> 物品 ID 列表，按 Objects.json 中的顺序排列"""
+        index: dict[int, list[str]] = {}
+        for object_id, object_data in self.objects_data.items():
+            index.setdefault(object_data.get("Category"), []).append(object_id)
+        return index
+
+    def _build_object_order(self) -> dict[str, int]:
+        """物品 ID -> 在 Objects.json 中的位置"""
+        return {object_id: i for i, object_id in enumerate(self.objects_data)}
+
+    def _build_qualified_ids(self) -> dict[str, str]:
+        """内部名称 -> QualifiedItemId，名称重复时保留最先出现的物品，物品优先于大型物品"""
+        index: dict[str, str] = {}
+        for code, object_data in self.objects_data.items():
+            index.setdefault(object_data.get("Name"), Object.qualify(code))
+        for code, bc_data in self.bigcraftables_data.items():
+            index.setdefault(bc_data.get("Name"), BigCraftable.qualify(code))
+        return index
+
+    def _build_sprites(self) -> dict[str | None, dict[int, str]]:
+        """贴图路径 -> 贴图序号 -> 物品 ID，使用默认贴图（springobjects）的物品贴图路径为 None，序号重复时保留最先出现的物品"""
+        index: dict[str | None, dict[int, str]] = {}
+        for code, object_data in self.objects_data.items():
+            sprite_index = object_data.get("SpriteIndex")
+            if sprite_index is not None:
+                index.setdefault(object_data.get("Texture"), {}).setdefault(sprite_index, code)
+        return index
+
+    def _build_objects_frame(self) -> pd.DataFrame:
+        """物品的列式视图，以物品 ID 为索引，按 Objects.json 中的顺序排列"""
+        import pandas as pd
+
+        objects = self.objects_data.values()
+        frame = pd.DataFrame(
+            {
+                "name": pd.Series([o.get("Name") for o in objects], dtype=object),
+                "display_name": pd.Series(self._get_display_names(self.objects_data, Object.qualify), dtype=object),
+                "category": pd.array([o.get("Category") for o in objects], dtype="Int64"),
+                "price": pd.array([o.get("Price") for o in objects], dtype="Int64"),
+                "edibility": pd.array([o.get("Edibility") for o in objects], dtype="Int64"),
+                "color": pd.Series([Object(o, "").color for o in objects], dtype=object),
+                "context_tags": pd.Series([o.get("ContextTags") for o in objects], dtype=object),
+                "exclude_from_random_sale": [o.get("ExcludeFromRandomSale") is True for o in objects],
+            },
+        )
+        frame.index = pd.Index(list(self.objects_data), dtype=object, name="id")
+        frame["xp"] = Crop.get_xp_series(frame["price"])
+        return frame
+
+    def _build_bigcraftables_frame(self) -> pd.DataFrame:
+        """大型物品的列式视图，以物品 ID 为索引，按 BigCraftables.json 中的顺序排列"""
+        import pandas as pd
+
+        bcs = self.bigcraftables_data.values()
+        frame = pd.DataFrame(
+            {
+                "name": pd.Series([bc.get("Name") for bc in bcs], dtype=object),
+                "display_name": pd.Series(
+                    self._get_display_names(self.bigcraftables_data, BigCraftable.qualify), dtype=object),
+                "price": pd.array([bc.get("Price") for bc in bcs], dtype="Int64"),
+                "context_tags": pd.Series([bc.get("ContextTags") for bc in bcs], dtype=object),
+            },
+        )
+        frame.index = pd.Index(list(self.bigcraftables_data), dtype=object, name="id")
+        return frame
+
+    def _get_display_names(self, data_source: dict[str, dict], qualify: Callable[[str], str]) -> list[str | None]:
+        """
+        批量获取物品的本地化名称，与 get_display_name 的结果一致，无法解析本地化键的物品为 None
+        :param data_source: 物品数据字典
+        :param qualify: 将物品 ID 转化为 QualifiedItemId 的方法
+        :return: 本地化名称列表，按 data_source 中的顺序排列
+        """
+        localization_keys = self._get_index("localization_keys")
+        names: list[str | None] = []
+        for code in data_source:
+            localization_key = localization_keys[qualify(code)]
+            if localization_key is None:
+                names.append(None)
+            else:
+                names.append(self.objects_zh_cn.get(localization_key, "未知物品"))
+        return names
+
+    def _build_random_sale_objects(self) -> pd.DataFrame:
+        """猪车可能随机出售的物品，即 ID 为 2 ~ 789、类型值不为 -999 且未被排除的物品，按数字 ID 升序排列"""
+        import pandas as pd
+
+        frame = self.get_objects_frame()
+        ids = frame.index.to_series()
+        # 只有纯数字的 ID 才可能被猪车选中
+        numeric_ids = pd.to_numeric(ids.where(ids.str.fullmatch(r"[1-9]\d*")), errors="coerce")
+        mask = (numeric_ids.between(2, 789)
+                & frame["category"].ne(-999).fillna(True)
+                & ~frame["exclude_from_random_sale"])
+        return frame.loc[mask, ["price"]].assign(numeric_id=numeric_ids[mask]).sort_values("numeric_id")
+
+    def _build_localization_keys(self) -> dict[str, str | None]:
+        """QualifiedItemId -> 本地化键，无法解析时为 None"""
+        index: dict[str, str | None] = {}
+        for code, object_data in self.objects_data.items():
+            index[Object.qualify(code)] = self._parse_localization_key(object_data.get("DisplayName", ""))
+        for code, bc_data in self.bigcraftables_data.items():
+            index[BigCraftable.qualify(code)] = self._parse_localization_key(bc_data.get("DisplayName", ""))
+        return index
+
+    def _parse_localization_key(self, display_name: str) -> str | None:
+        """
+        从 DisplayName 中解析出本地化键
+        :param display_name: 物品数据中的 DisplayName 字段
+        :return: 本地化键，若无法解析则返回 None
+        """
+        match self.namespace:
             case "Vanilla":
-                json_path = Path(__file__).parent.parent / "json"
-                self.objects_data = FileUtils.read_json(json_path / "Objects.json")
-                self.objects_zh_cn = FileUtils.read_json(json_path / "Objects.zh-CN.json")
-                self.bigcraftables_data = FileUtils.read_json(json_path / "BigCraftables.json")
-                self.bigcraftables_zh_cn = FileUtils.read_json(json_path / "BigCraftables.zh-CN.json")
-                self.crops_data = FileUtils.read_json(json_path / "Crops.json")
-                self.fruit_trees_data = FileUtils.read_json(json_path / "FruitTrees.json")
-                self.shops_data = FileUtils.read_json(json_path / "Shops.json")
-                self.fish_data = FileUtils.read_json(json_path / "Fish.json")
-                self.weapon_data = FileUtils.read_json(json_path / "Weapons.json")
-                self.item_id = FileUtils.read_json(json_path / "ItemID.json")
-            # 读取 SVE JSON 文件
+                # 提取本地化键，格式如 "[LocalizedText Strings\Objects:Moss_Name]"
+                if display_name.startswith("[LocalizedText"):
+                    match = re.search(r":([^]]+)_Name]", display_name)
+                    if match:
+                        return match.group(1) + "_Name"
             case "SVE":
-                json_path = Path(__file__).parent.parent / "json_sve"
-                self.objects_data = FileUtils.read_json(json_path / "Objects.json")
-                self.objects_zh_cn = self.bigcraftables_zh_cn = FileUtils.read_json(json_path / "zh.json")
-                self.bigcraftables_data = FileUtils.read_json(json_path / "BigCraftables.json")
-                self.bigcraftables_zh_cn = self.bigcraftables_zh_cn = FileUtils.read_json(json_path / "zh.json")
-                self.crops_data = FileUtils.read_json(json_path / "Crops.json")
-                self.fruit_trees_data = FileUtils.read_json(json_path / "FruitTrees.json")
-                self.shops_data = FileUtils.read_json(json_path / "Shops.json")
-                self.namespace = "SVE"
-
-        if self.objects_data == {}:
-            raise ValueError("不合法的命名空间！")
+                # 提取本地化键，格式如 "{{i18n:object.aegis-elixir.name}}"
+                if display_name.startswith("{{i18n:"):
+                    match = re.search(r"\{\{i18n:([^}]+)}}", display_name)
+                    if match:
+                        return match.group(1)
+        return None
+
+    def get_seeds(self, harvest_id: str) -> list[str]:
+        """
+        获取收获物为指定物品的全部作物种子
+        :param harvest_id: 收获物品的 QualifiedItemId 或 Id
+        :return: 作物种子 ID 列表，按 Crops.json 中的顺序排列
+        """
+        return self._get_index("seeds").get(Object.trim(harvest_id), [])
+
+    def get_saplings(self, fruit_id: str) -> list[str]:
+        """
+        获取果实为指定物品的全部果树树苗
+        :param fruit_id: 果实的 QualifiedItemId 或 Id
+        :return: 果树树苗 ID 列表，按 FruitTrees.json 中的顺序排列
+        """
+        return self._get_index("saplings").get(Object.trim(fruit_id), [])
+
+    def get_objects_by_category(self, *categories: int) -> list[str]:
+        """
+        获取属于指定类型的全部物品
+        :param categories: 物品类型值，例如 -79，可以传入多个
+        :return: 物品 ID 列表，按 Objects.json 中的顺序排列
+        """
+        index = self._get_index("categories")
+        if len(categories) == 1:
+            return list(index.get(categories[0], []))
+
+        object_ids = [object_id for category in categories for object_id in index.get(category, [])]
+        return sorted(object_ids, key=self._get_index("object_order").__getitem__)
+
+    def get_objects_frame(self) -> pd.DataFrame:
+        """
+        获取物品的列式视图，用于批量筛选和计算
+        :return: 以物品 ID 为索引的 DataFrame
+        """
+        return self._get_index("objects_frame")
+
+    def get_bigcraftables_frame(self) -> pd.DataFrame:
+        """
+        获取大型物品的列式视图，用于批量筛选和计算
+        :return: 以物品 ID 为索引的 DataFrame
+        """
+        return self._get_index("bigcraftables_frame")
+
+    @staticmethod
+    def iter_rows(frame: pd.DataFrame) -> Iterator[tuple]:
+        """
+        逐行遍历列式视图，与 DataFrame.itertuples 相同，但缺失值（pd.NA）会转换为 None，与直接读取原始数据时一致
+        :param frame: get_objects_frame 等方法返回的 DataFrame 或其筛选结果
+        """
+        return frame.astype(object).where(frame.notna(), None).itertuples()
+
+    def get_random_sale_objects(self) -> pd.DataFrame:
+        """
+        获取猪车可能随机出售的全部物品
+        :return: 以物品 ID 为索引的 DataFrame，包含 price 列
+        """
+        return self._get_index("random_sale_objects")
+
+    def get_sprite_ids(self, texture: str | None = None) -> dict[int, str]:
+        """
+        获取贴图中每个序号对应的物品
+        :param texture: 贴图路径，例如 TileSheets\\Objects_2，留空则为默认的 springobjects
+        :return: 贴图序号 -> 物品 ID
+        """
+        return self._get_index("sprites").get(texture, {})
+
+    def get_qualified_id(self, name: str) -> str | None:
+        """
+        根据物品的内部名称（英文）获取 QualifiedItemId
+        :param name: 物品的内部名称
+        :return: 物品的 QualifiedItemId，若未找到则返回 None
+        """
+        return self._get_index("qualified_ids").get(name)
 
     def try_get_object(self, code: str) -> Object | None:
         """
@@ -161,33 +451,13 @@ class GameData:
         :return: 物品的本地化名称
         """
         if code.startswith("(BC)"):
-            data_source = self.bigcraftables_data
-            code = BigCraftable.trim(code)
+            qualified_code = code
         else:
-            data_source = self.objects_data
-            code = Object.trim(code)
-
-        if code in data_source:
-            object_data = data_source[code]
-            display_name = object_data.get("DisplayName", "")
-            localization_key = None
-
-            match self.namespace:
-                case "Vanilla":
-                    # 解析DisplayName中的本地化键
-                    if display_name.startswith("[LocalizedText"):
-                        # 提取本地化键，格式如 "[LocalizedText Strings\Objects:Moss_Name]"
-                        match = re.search(r":([^]]+)_Name]", display_name)
-                        if match:
-                            localization_key = match.group(1) + "_Name"
-                case "SVE":
-                    # 解析DisplayName中的本地化键
-                    if display_name.startswith("{{i18n:"):
-                        # 提取本地化键，格式如 "[LocalizedText Strings\Objects:Moss_Name]"
-                        match = re.search(r"\{\{i18n:([^}]+)}}", display_name)
-                        if match:
-                            localization_key = match.group(1)
+            qualified_code = Object.qualify(code)
 
+        localization_keys = self._get_index("localization_keys")
+        if qualified_code in localization_keys:
+            localization_key = localization_keys[qualified_code]
             if localization_key is None:
                 raise ValueError("unknown namespace!")
 
@@ -213,15 +483,36 @@ class Object:
         quantity: 物品数量
     """
 
+    __slots__ = ("raw", "itemID", "quantity", "_color")
+
     def __init__(self, obj: dict, ID: str) -> None:
         self.raw: dict = obj
-        self.name: str = obj.get("Name")
-        self.category: int = obj.get("Category")
-        self.sellprice: int = obj.get("Price")
-        self.edibility: int = obj.get("Edibility")
-        self.color: str = self._get_color()
         self.itemID = ID
         self.quantity = 1
+        self._color: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.raw.get("Name")
+
+    @property
+    def category(self) -> int:
+        return self.raw.get("Category")
+
+    @property
+    def sellprice(self) -> int:
+        return self.raw.get("Price")
+
+    @property
+    def edibility(self) -> int:
+        return self.raw.get("Edibility")
+
+    @property
+    def color(self) -> str:
+        """物品的颜色值，首次读取时才从 ContextTags 中解析"""
+        if self._color is None:
+            self._color = self._get_color()
+        return self._color
 
     def _get_color(self) -> str:
         """
@@ -281,12 +572,17 @@ class BigCraftable:
         quantity: 物品数量
     """
 
+    __slots__ = ("raw", "itemID", "quantity")
+
     def __init__(self, obj: dict, ID: str) -> None:
         self.raw: dict = obj
-        self.name: str = obj.get("Name")
         self.itemID = BigCraftable.qualify(ID)
         self.quantity = 1
 
+    @property
+    def name(self) -> str:
+        return self.raw.get("Name")
+
     @staticmethod
     def trim(code: str) -> str:
         """
@@ -331,11 +627,22 @@ class Crop:
         seasons: 作物生长的季节
     """
 
+    __slots__ = ("raw",)
+
     def __init__(self, crop: dict):
         self.raw: dict = crop
-        self.harvest: str = crop.get("HarvestItemId")
-        self.growth: int = sum(crop.get("DaysInPhase"))
-        self.seasons: str = self._get_season(crop.get("Seasons"))
+
+    @property
+    def harvest(self) -> str:
+        return self.raw.get("HarvestItemId")
+
+    @property
+    def growth(self) -> int:
+        return sum(self.raw.get("DaysInPhase"))
+
+    @property
+    def seasons(self) -> str:
+        return self._get_season(self.raw.get("Seasons"))
 
     @staticmethod
     def _get_season(seasons: list[str]) -> str:
@@ -354,6 +661,17 @@ class Crop:
         exp = round(exp, 0)
         return int(exp)
 
+    @staticmethod
+    def get_xp_series(sellprices: pd.Series) -> pd.Series:
+        """get_xp 的向量化版本，传入一组作物售价，一次性计算对应的经验值"""
+        import numpy as np
+
+        # 售价过低导致对数无意义时，经验值为空
+        base = 0.018 * sellprices.astype("Float64") + 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            exp = 16 * np.log(base.where(base > 0))
+        return exp.round(0).astype("Int64")
+
     def get_field(self, field: str) -> Any:
         """
         获取物品的指定属性信息
@@ -376,10 +694,18 @@ class FruitTree:
         seasons: 作物生长的季节
     """
 
+    __slots__ = ("raw",)
+
     def __init__(self, fruit_tree: dict):
         self.raw: dict = fruit_tree
-        self.harvest: str = Object.trim(fruit_tree.get("Fruit")[0].get("ItemId"))
-        self.seasons: str = self._get_season(fruit_tree.get("Seasons"))
+
+    @property
+    def harvest(self) -> str:
+        return Object.trim(self.raw.get("Fruit")[0].get("ItemId"))
+
+    @property
+    def seasons(self) -> str:
+        return self._get_season(self.raw.get("Seasons"))
 
     @staticmethod
     def _get_season(seasons: list[str]) -> str:
@@ -0,0 +1,171 @@
+"""
+本地的 MediaWiki 替身
+
+实现了机器人用到的 mwclient.Site 的部分接口（pages[title].text()、pages[title].edit(...)，
+以及 api("query", prop="info" | "revisions", titles=...)），
+查询时与 MediaWiki 一样会规范化标题并限制单次查询的标题数量，也可以限制每次返回的页面文本数量以模拟分段返回（continue）。
+页面保存在内存中，也可以从 JSON 文件读取或保存到 JSON 文件，用于在不联网的情况下试运行上传等操作。
+"""
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from src.Utilities import FileUtils
+
+# MediaWiki 对普通用户单次查询的标题数量限制
+MAX_TITLES = 50
+
+
+class LocalPage:
+    """
+    本地替身中的页面，接口与 mwclient.page.Page 一致
+
+    Attributes:
+        site: 页面所在的 LocalSite
+        name: 页面标题
+    """
+
+    def __init__(self, site: LocalSite, name: str) -> None:
+        self.site = site
+        self.name = name
+
+    @property
+    def exists(self) -> bool:
+        return self.name in self.site.store
+
+    @property
+    def revision(self) -> int:
+        """当前修订版本号，页面不存在时为 0"""
+        return self.site.store.get(self.name, {}).get("revid", 0)
+
+    def text(self, section=None, expandtemplates=False, cache=True, slot="main") -> str:
+        """获取页面的当前文本，页面不存在时返回空字符串"""
+        return self.site.store.get(self.name, {}).get("text", "")
+
+    def edit(self, text: str, summary: str = "", minor: bool = False, bot: bool = True, section=None,
+             **kwargs) -> dict[str, Any]:
+        """
+        编辑页面，返回值的格式与 MediaWiki API 的 edit 操作一致
+        :param text: 新的页面文本
+        :param summary: 编辑摘要
+        """
+        return self.site.save_page(self.name, text, summary)
+
+
+class _LocalPages:
+    """与 mwclient 的 site.pages 一致，通过 pages[title] 获取页面"""
+
+    def __init__(self, site: LocalSite) -> None:
+        self._site = site
+
+    def __getitem__(self, name: str) -> LocalPage:
+        return LocalPage(self._site, name)
+
+
+class LocalSite:
+    """
+    本地的 MediaWiki 替身
+
+    Attributes:
+        store: 页面标题 -> {"revid": 修订版本号, "text": 页面文本}
+        edits: 每次编辑的记录，用于检查试运行的结果
+        requests: api 被调用的次数
+        queries: 每次调用 api 时的请求参数，用于检查请求是否按预期分批
+        filepath: 页面数据的保存路径，为 None 时只保存在内存中
+        revisions_limit: prop=revisions 时每次最多返回几个页面的文本，其余页面不含 revisions，
+                         并在返回值中给出 continue，与 MediaWiki 返回内容过大时的行为一致；为 None 时不限制
+    """
+
+    def __init__(self, filepath: Optional[Union[str, Path]] = None, revisions_limit: Optional[int] = None) -> None:
+        self.filepath = Path(filepath) if filepath is not None else None
+        self.revisions_limit = revisions_limit
+        self.store: dict[str, dict[str, Any]] = {}
+        self.edits: list[dict[str, Any]] = []
+        self.requests = 0
+        self.queries: list[dict[str, Any]] = []
+        self.pages = _LocalPages(self)
+        self._last_revid = 0
+        self._lock = threading.Lock()
+
+        if self.filepath is not None and self.filepath.exists():
+            self.store = FileUtils.read_json(self.filepath)
+            self._last_revid = max((page["revid"] for page in self.store.values()), default=0)
+
+    def api(self, action: str, **kwargs) -> dict[str, Any]:
+        """
+        模拟 MediaWiki API，目前仅支持 action=query 的 prop=info 和 prop=revisions，返回格式与 formatversion=1 一致
+        :param action: API 操作
+        :param kwargs: 请求参数
+        :return: API 的返回值
+        """
+        if action != "query" or kwargs.get("prop") not in ("info", "revisions"):
+            raise NotImplementedError(f"unsupported api call: {action} {kwargs}")
+
+        titles = kwargs.get("titles", "").split("|")
+        if len(titles) > MAX_TITLES:
+            raise ValueError(f"toomanyvalues: too many values supplied for parameter titles, the limit is {MAX_TITLES}")
+
+        self.requests += 1
+        self.queries.append(kwargs)
+        pages: dict[str, dict[str, Any]] = {}
+        normalized: list[dict[str, str]] = []
+        missing_id = 0
+        # 分段返回时，本次返回文本的页面范围为 [start, end)，按存在的页面在 titles 中的顺序计数
+        start = int(kwargs.get("rvcontinue", 0))
+        end = start + self.revisions_limit if self.revisions_limit is not None else None
+        existing = 0
+        for title in titles:
+            normalized_title = self.normalize_title(title)
+            if normalized_title != title:
+                normalized.append({"from": title, "to": normalized_title})
+                title = normalized_title
+            page = self.store.get(title)
+            if page is None:
+                missing_id -= 1
+                pages[str(missing_id)] = {"ns": 0, "title": title, "missing": ""}
+                continue
+            data: dict[str, Any] = {"pageid": page["revid"], "ns": 0, "title": title}
+            if kwargs["prop"] == "info":
+                data["lastrevid"] = page["revid"]
+            elif start <= existing and (end is None or existing < end):
+                data["revisions"] = [{"revid": page["revid"], "slots": {"main": {"*": page["text"]}}}]
+            existing += 1
+            pages[str(page["revid"])] = data
+        query: dict[str, Any] = {"pages": pages}
+        if normalized:
+            query["normalized"] = normalized
+        if kwargs["prop"] == "revisions" and end is not None and end < existing:
+            return {"continue": {"rvcontinue": str(end), "continue": "||"}, "query": query}
+        return {"batchcomplete": "", "query": query}
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        """
+        与 MediaWiki 一样规范化标题：下划线转换为空格，去除首尾空格，首字母大写
+        :param title: 页面标题
+        """
+        title = title.replace("_", " ").strip()
+        return title[:1].upper() + title[1:]
+
+    def save_page(self, name: str, text: str, summary: str = "") -> dict[str, Any]:
+        """
+        保存页面，文本未变化时不产生新的修订版本
+        :param name: 页面标题
+        :param text: 新的页面文本
+        :param summary: 编辑摘要
+        :return: 与 MediaWiki API 的 edit 操作一致的返回值
+        """
+        with self._lock:
+            old = self.store.get(name)
+            if old is not None and old["text"] == text:
+                return {"result": "Success", "title": name, "nochange": ""}
+
+            self._last_revid += 1
+            self.store[name] = {"revid": self._last_revid, "text": text}
+            self.edits.append({"title": name, "revid": self._last_revid, "summary": summary})
+            if self.filepath is not None:
+                FileUtils.write_json(self.store, self.filepath)
+
+            return {"result": "Success", "title": name, "oldrevid": old["revid"] if old else 0,
+                    "newrevid": self._last_revid}
@@ -0,0 +1,146 @@
+"""
+带修订版本号的本地页面缓存
+
+页面文本按标题缓存，同时记录对应的修订版本号。读取页面时先通过 prop=info 批量查询最新的修订版本号，
+只有版本号发生变化的页面才会通过 prop=revisions 批量获取文本，每次请求最多包含 50 个标题。
+返回内容过大时 MediaWiki 只会返回部分页面的文本，此时会按 continue 继续请求，直到获取全部页面的文本。
+只有被 API 标记为 missing 的页面才会视为空页面，无法获取文本的页面会抛出异常，避免以空文本覆盖页面。
+
+使用方式:
+cache = PageCache(wiki, Path(".cache/pages.json"))
+texts = cache.fetch(["页面1", "页面2"])
+cache.save()
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from src.Utilities import FileUtils
+
+# MediaWiki 对普通用户单次查询的标题数量限制
+BATCH_SIZE = 50
+
+
+class PageCache:
+    """
+    带修订版本号的本地页面缓存
+
+    Attributes:
+        site: mwclient.Site 或 LocalSite 实例
+        filepath: 缓存文件路径，为 None 时只保存在内存中
+        pages: 页面标题 -> {"revid": 修订版本号, "text": 页面文本}，不存在的页面版本号为 0
+        requests: 本实例发出的 API 请求次数
+    """
+
+    def __init__(self, site: Any, filepath: Optional[Union[str, Path]] = None, batch_size: int = BATCH_SIZE) -> None:
+        self.site = site
+        self.filepath = Path(filepath) if filepath is not None else None
+        self.batch_size = batch_size
+        self.pages: dict[str, dict[str, Any]] = {}
+        self.requests = 0
+
+        if self.filepath is not None and self.filepath.exists():
+            self.pages = FileUtils.read_json(self.filepath)
+
+    def fetch(self, titles: Iterable[str]) -> dict[str, str]:
+        """
+        获取多个页面的当前文本，只有在 wiki 上发生变化的页面才会重新下载
+        :param titles: 页面标题
+        :return: 页面标题 -> 页面文本，不存在的页面为空字符串
+        :exception RuntimeError: API 没有返回某个页面的信息或文本
+        """
+        titles = list(dict.fromkeys(titles))
+
+        # 先批量查询最新的修订版本号，找出缓存已过期的页面
+        stale: list[str] = []
+        for batch in self._batches(titles):
+            pages = self._query(batch, prop="info")
+            for title in batch:
+                page = self._get_page(pages, title)
+                if "missing" in page:
+                    self.pages[title] = {"revid": 0, "text": ""}
+                    continue
+                if "lastrevid" not in page:
+                    raise RuntimeError(f"无法获取页面 {title} 的修订版本号：{page}")
+                cached = self.pages.get(title)
+                if cached is None or cached["revid"] != page["lastrevid"]:
+                    stale.append(title)
+
+        # 再批量下载过期页面的文本
+        for batch in self._batches(stale):
+            pages = self._query(batch, prop="revisions", rvprop="ids|content", rvslots="main")
+            for title in batch:
+                page = self._get_page(pages, title)
+                if "missing" in page:
+                    # 查询修订版本号之后页面被删除
+                    self.pages[title] = {"revid": 0, "text": ""}
+                    continue
+                if not page.get("revisions"):
+                    raise RuntimeError(f"无法获取页面 {title} 的文本：{page}")
+                revision = page["revisions"][0]
+                self.pages[title] = {"revid": revision["revid"], "text": revision["slots"]["main"]["*"]}
+
+        return {title: self.pages[title]["text"] for title in titles}
+
+    def get(self, title: str) -> Optional[str]:
+        """
+        获取缓存中的页面文本，不会发出请求
+        :param title: 页面标题
+        :return: 页面文本，若未缓存则返回 None
+        """
+        page = self.pages.get(title)
+        return None if page is None else page["text"]
+
+    def update(self, title: str, revid: int, text: str) -> None:
+        """
+        编辑页面后更新缓存，避免下次读取时重新下载
+        :param title: 页面标题
+        :param revid: 编辑后的修订版本号，即 edit 返回值中的 newrevid
+        :param text: 编辑后的页面文本
+        """
+        self.pages[title] = {"revid": revid, "text": text}
+
+    def save(self) -> None:
+        """将缓存写入文件"""
+        if self.filepath is not None:
+            FileUtils.write_json(self.pages, self.filepath, indent=0)
+
+    def _batches(self, titles: list[str]) -> Iterable[list[str]]:
+        """将标题按 batch_size 分组"""
+        for i in range(0, len(titles), self.batch_size):
+            yield titles[i:i + self.batch_size]
+
+    @staticmethod
+    def _get_page(pages: dict[str, dict[str, Any]], title: str) -> dict[str, Any]:
+        """从 _query 的返回值中取出指定页面的数据，API 没有返回该页面时抛出异常"""
+        if title not in pages:
+            raise RuntimeError(f"API 没有返回页面 {title} 的数据")
+        return pages[title]
+
+    def _query(self, titles: list[str], **kwargs) -> dict[str, dict[str, Any]]:
+        """
+        对一组标题发出 query 请求，返回值中带有 continue 时继续请求，直到获取全部数据
+        :param titles: 页面标题，数量不超过 batch_size
+        :param kwargs: 其余请求参数
+        :return: 请求时使用的标题 -> 返回的页面数据，标题经过规范化的页面也会对应到原标题
+        """
+        pages: dict[str, dict[str, Any]] = {}
+        continue_params: dict[str, Any] = {}
+        while True:
+            self.requests += 1
+            response = self.site.api("query", titles="|".join(titles), **kwargs, **continue_params)
+            result = response.get("query", {})
+
+            # MediaWiki 会规范化标题（例如首字母大写），需要映射回请求时使用的标题
+            normalized = {item["to"]: item["from"] for item in result.get("normalized", [])}
+            for page in result.get("pages", {}).values():
+                merged = pages.setdefault(normalized.get(page["title"], page["title"]), {})
+                # 分段返回时，同一页面的 revisions 可能出现在之后的某一次返回中
+                revisions = merged.get("revisions", []) + page.get("revisions", [])
+                merged.update(page)
+                if revisions:
+                    merged["revisions"] = revisions
+
+            if "continue" not in response:
+                return pages
+            continue_params = response["continue"]
@@ -1,14 +1,25 @@
+from typing import Iterable, Optional
+
 from mwclient import Site
 from pathlib import Path
-from utils import FileUtils
+from src.Utilities import FileUtils
+from src.MediaWikiBot.LocalSite import LocalSite
+from src.MediaWikiBot.PageCache import PageCache
+from src.MediaWikiBot.Wikitext import is_same, parse
+from src.MediaWikiBot.Uploader import Uploader
 
 _available = False
-_sess: dict[str, str] = FileUtils.read_json(Path(__file__).parent.parent.parent / "json" / "SESSDATA.json")
-wiki: Site | None = Site("wiki.biligame.com/stardewvalley", path="/")
+wiki: Site | None = None
+
+# 页面缓存文件，记录页面文本及其修订版本号，未变化的页面不会重复下载
+PAGE_CACHE = Path(__file__).parent.parent.parent / ".cache" / "pages.json"
 
 
 def initialize(uid: str) -> bool:
+    global wiki
 
+    _sess: dict[str, str] = FileUtils.read_json(Path(__file__).parent.parent.parent / "json" / "SESSDATA.json")
+    wiki = Site("wiki.biligame.com/stardewvalley", path="/")
     wiki.login(cookies={'SESSDATA': _sess["SummerFleur"]})
 
     if wiki.username == uid:
@@ -26,37 +37,59 @@ def new_redirect(**kwargs) -> None:
 
 def text_replace() -> None:
     pages = ()
+    cache = PageCache(wiki, PAGE_CACHE)
+    texts = cache.fetch(pages)
     for page in pages:
-        target_page = wiki.pages[page]
-        text = target_page.text()
-        new_text = text.replace("<UNK>", "<UNK>")
-        result = target_page.edit(text=new_text, summary="返回至模板旧名称")
+        new_text = texts[page].replace("<UNK>", "<UNK>")
+        # 与 upload_pages 一致，规范化后与 wiki 上相同的页面不发出编辑请求
+        if is_same(texts[page], new_text):
+            print(f"[未变化] {page}")
+            continue
+        result = wiki.pages[page].edit(text=new_text, summary="返回至模板旧名称")
         print(result)
+        if "newrevid" in result:
+            cache.update(page, result["newrevid"], new_text)
+    cache.save()
+
+
+def upload_pages(pages: Iterable[tuple[str, str]], summary: str, dry_run: bool = False,
+                 checkpoint: Optional[Path] = None, skip_unchanged: bool = True, **kwargs) -> dict:
+    """
+    批量上传页面
+    :param pages: (页面标题, 页面文本)
+    :param summary: 编辑摘要
+    :param dry_run: 是否试运行，为 True 时上传至本地替身 LocalSite 而不是 wiki
+    :param checkpoint: 检查点文件路径，中断后再次运行时会跳过已上传的页面
+    :param skip_unchanged: 是否跳过与 wiki 上的当前文本相同（忽略空白和模板参数顺序）的页面
+    :param kwargs: 传递给 Uploader 的其余参数，例如 workers、rate、retries
+    :return: 上传结果
+    """
+    site = LocalSite() if dry_run else wiki
+    cache = PageCache(site, None if dry_run else PAGE_CACHE) if skip_unchanged else None
+    return Uploader(site, summary, checkpoint=checkpoint, cache=cache, **kwargs).upload(pages)
 
 
 def include_transformer(**kwargs) -> str:
-    parts = kwargs['text'].split(f"{{{{Infobox {kwargs['type']}")
-
-    count = 0
-    ptr = 0
-    for letter in parts[-1]:
-        ptr += 1
-
-        if letter == "{":
-            count += 1
-        elif letter == "}":
-            count -= 1
-        else:
-            continue
-
-        if count < 0:
-            ptr += 1
-            break
-
-    latter = parts[-1][0:ptr] + "</onlyinclude>" + parts[-1][ptr:]
-    former = parts[0] if len(parts) == 2 else ""
-
-    return former + f"<onlyinclude>{{{{{{{{{{1|Infobox {kwargs['type']}}}}}}}" + latter
+    """
+    将页面中的 Infobox 改写为 <onlyinclude>{{{{{1|Infobox 类型}}}...}}</onlyinclude> 的形式，
+    页面中有多个同类 Infobox 时以最后一个为准，已经改写过的页面保持不变
+    :param text: 页面文本
+    :param type: Infobox 类型，例如 fish
+    :return: 改写后的页面文本
+    """
+    doc = parse(kwargs['text'])
+    templates = doc.find(f"Infobox {kwargs['type']}")
+    if not templates:
+        raise ValueError(f"Infobox {kwargs['type']} not found!")
+
+    infobox = templates[-1]
+    if infobox.name.startswith("{{{"):
+        return kwargs['text']
+
+    doc.replace(infobox.start, infobox.start, "<onlyinclude>")
+    doc.replace(infobox.name_start, infobox.name_end, f"{{{{{{1|Infobox {kwargs['type']}}}}}}}")
+    doc.replace(infobox.end, infobox.end, "</onlyinclude>")
+    return doc.render()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+"""
+批量上传页面
+
+使用有限数量的线程并行编辑页面，通过令牌桶限制编辑频率，失败时按指数退避重试，
+并将已完成的页面记录在检查点文件中，中断后再次运行时会跳过已上传且内容未变的页面。
+传入 PageCache 时，会先批量获取页面的当前文本，规范化后与 wiki 上相同的页面不会发出编辑请求。
+
+使用方式:
+uploader = Uploader(wiki, summary="更新 Infobox", checkpoint=Path("upload.jsonl"))
+report = uploader.upload((title, text) for _, title, text in iter_infobox())
+
+传入 LocalSite 即可在不联网的情况下试运行。
+"""
+from __future__ import annotations
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from mwclient.errors import (AssertUserFailedError, InsufficientPermission, InvalidPageTitle, ProtectedPageError,
+                             UserBlocked)
+
+from src.MediaWikiBot.PageCache import PageCache
+from src.MediaWikiBot.Wikitext import is_same
+from src.Utilities import FileUtils
+
+# 重试也无法解决的错误，遇到时直接记为失败
+_FATAL_ERRORS = (AssertUserFailedError, InsufficientPermission, InvalidPageTitle, ProtectedPageError, UserBlocked)
+
+
+class TokenBucket:
+    """
+    令牌桶，用于限制多个线程的总请求频率
+
+    Attributes:
+        rate: 每秒补充的令牌数，即长期的平均请求频率
+        capacity: 令牌桶容量，即允许的最大突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive!")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens: float = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Uploader:
+    """
+    批量上传页面
+
+    Attributes:
+        site: mwclient.Site 或 LocalSite 实例
+        summary: 编辑摘要
+        workers: 并行编辑的线程数
+        retries: 每个页面失败后的最大重试次数
+        backoff: 第一次重试前等待的秒数，之后每次翻倍
+        checkpoint: 检查点文件路径，为 None 时不记录
+        cache: 页面缓存，为 None 时不与 wiki 上的当前文本比较
+    """
+
+    def __init__(self, site: Any, summary: str, workers: int = 4, rate: float = 1.0, burst: int = 1,
+                 retries: int = 3, backoff: float = 2.0, checkpoint: Optional[Union[str, Path]] = None,
+                 cache: Optional[PageCache] = None) -> None:
+        """
+        :param rate: 每秒最多编辑的页面数
+        :param burst: 允许的最大突发编辑数
+        """
+        self.site = site
+        self.summary = summary
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.checkpoint = Path(checkpoint) if checkpoint is not None else None
+        self.cache = cache
+        self._bucket = TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+        self._done: dict[str, str] = self._load_checkpoint()
+
+    def upload(self, pages: Iterable[tuple[str, str]]) -> dict[str, Any]:
+        """
+        上传页面，pages 会被逐个读取，同一时间最多只有 workers 的两倍个页面在等待上传
+        :param pages: (页面标题, 页面文本)
+        :return: {"uploaded": [...], "skipped": [...], "unchanged": [...], "failed": {标题: 错误信息}}，
+                 skipped 为检查点中已上传的页面，unchanged 为与 wiki 上的当前文本相同的页面
+        """
+        report: dict[str, Any] = {"uploaded": [], "skipped": [], "unchanged": [], "failed": {}}
+        window = threading.BoundedSemaphore(self.workers * 2)
+
+        def on_done(future: Future, title: str) -> None:
+            window.release()
+            error = future.exception()
+            with self._lock:
+                if error is None:
+                    report["uploaded"].append(title)
+                else:
+                    report["failed"][title] = f"{type(error).__name__}: {error}"
+                    print(f"[失败] {title}：{error}")
+
+        # 获取页面或编辑失败而中断时，也保存已更新的缓存
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for title, text, text_hash in self._filter_unchanged(self._filter_done(pages, report), report):
+                    window.acquire()
+                    future = executor.submit(self._edit, title, text, text_hash)
+                    future.add_done_callback(lambda f, t=title: on_done(f, t))
+        finally:
+            if self.cache is not None:
+                self.cache.save()
+        return report
+
+    def _filter_done(self, pages: Iterable[tuple[str, str]],
+                     report: dict[str, Any]) -> Iterable[tuple[str, str, str]]:
+        """
+        跳过检查点中已上传且内容未变的页面，在获取 wiki 上的当前文本之前进行，恢复上传时无需重新下载这些页面
+        :param pages: (页面标题, 页面文本)
+        :param report: 上传结果，跳过的页面会记录在 skipped 中
+        :return: 尚未上传的 (页面标题, 页面文本, 文本的哈希值)
+        """
+        for title, text in pages:
+            text_hash = FileUtils.get_data_hash(text)
+            if self._done.get(title) == text_hash:
+                report["skipped"].append(title)
+                continue
+            yield title, text, text_hash
+
+    def _filter_unchanged(self, pages: Iterable[tuple[str, str, str]],
+                          report: dict[str, Any]) -> Iterable[tuple[str, str, str]]:
+        """
+        按 PageCache 的批量大小分批获取页面的当前文本，跳过规范化后与 wiki 上相同的页面
+        :param pages: (页面标题, 页面文本, 文本的哈希值)
+        :param report: 上传结果，跳过的页面会记录在 unchanged 中
+        :return: 需要编辑的 (页面标题, 页面文本, 文本的哈希值)
+        """
+        if self.cache is None:
+            yield from pages
+            return
+
+        pages = iter(pages)
+        while batch := list(islice(pages, self.cache.batch_size)):
+            current = self.cache.fetch(title for title, _, _ in batch)
+            for title, text, text_hash in batch:
+                if current[title] and is_same(current[title], text):
+                    report["unchanged"].append(title)
+                    continue
+                yield title, text, text_hash
+
+    def _edit(self, title: str, text: str, text_hash: str) -> None:
+        """编辑单个页面，失败时按指数退避重试"""
+        for attempt in range(self.retries + 1):
+            self._bucket.acquire()
+            try:
+                result = self.site.pages[title].edit(text=text, summary=self.summary)
+                print(f"[完成] {title}：{result}")
+                if self.cache is not None and "newrevid" in result:
+                    with self._lock:
+                        self.cache.update(title, result["newrevid"], text)
+                self._save_checkpoint(title, text_hash)
+                return
+            except _FATAL_ERRORS:
+                raise
+            except Exception as error:
+                if attempt == self.retries:
+                    raise
+                wait = self.backoff * 2 ** attempt
+                print(f"[重试] {title}：{error}，{wait:.1f} 秒后进行第 {attempt + 1} 次重试")
+                time.sleep(wait)
+
+    def _load_checkpoint(self) -> dict[str, str]:
+        """读取检查点文件，返回 页面标题 -> 已上传文本的哈希值"""
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return {}
+        done: dict[str, str] = {}
+        with self.checkpoint.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    done[record["title"]] = record["hash"]
+        return done
+
+    def _save_checkpoint(self, title: str, text_hash: str) -> None:
+        """将上传成功的页面追加到检查点文件"""
+        with self._lock:
+            self._done[title] = text_hash
+            if self.checkpoint is None:
+                return
+            self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+            with self.checkpoint.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"title": title, "hash": text_hash}, ensure_ascii=False) + "\n")
@@ -0,0 +1,384 @@
+"""
+wikitext 的模板解析与规范化
+
+parse 对页面文本进行一次线性扫描，按照 MediaWiki 预处理器的规则匹配花括号，得到页面中所有的模板
+（包括嵌套的模板）及其参数的位置。<!-- 注释 --> 和 <nowiki> 中的内容不会被解析，
+<onlyinclude> 的位置也会被记录下来。解析结果可以用于查找模板、读取参数，以及在原文中直接修改参数：
+
+doc = parse(text)
+infobox = doc.find("Infobox fish")[0]
+print(infobox.get("price").value)
+doc.set_param(infobox, "price", "30")
+new_text = doc.render()
+
+normalize 用于在上传前判断生成的页面与 wiki 上的当前版本是否只有格式上的差异。规范化会：
+1. 统一换行符为 \n，去掉每行末尾以及整个页面首尾的空白；
+2. 去掉模板名称和命名参数两侧的空白（MediaWiki 渲染时同样会忽略这些空白）；
+3. 将模板的命名参数按参数名排序，位置参数保持原有顺序。
+
+规范化后的文本只用于比较，不会被上传。
+"""
+from __future__ import annotations
+import re
+from typing import Optional
+
+# 需要处理的记号：注释、nowiki、onlyinclude 标签、连续的花括号、链接的方括号、参数分隔符
+_TOKEN = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<nowiki\s*/>|<nowiki\s*>.*?(?:</nowiki\s*>|\Z)"
+    r"|<(/?)onlyinclude\s*>"
+    r"|\{+|\}+|\[\[|\]\]|[|=]",
+    re.S | re.I
+)
+
+# 名称为模板参数的模板，例如 {{{{{1|Infobox fish}}} 中的 {{{1|Infobox fish}}}
+_ARGUMENT_NAME = re.compile(r"^\{\{\{[^{}|]*\|(.*)\}\}\}$", re.S)
+
+
+class Parameter:
+    """
+    模板的一个参数
+
+    Attributes:
+        name: 参数名，位置参数为其序号（从 1 开始）
+        value: 参数值的原文，命名参数不含 “=” 及之前的内容
+        positional: 是否为位置参数
+        start: 参数原文的起始位置（“|” 之后）
+        end: 参数原文的结束位置（下一个 “|” 或 “}}” 之前）
+        value_start: 参数值的起始位置
+    """
+
+    __slots__ = ("name", "value", "positional", "start", "end", "value_start")
+
+    def __init__(self, name: str, value: str, positional: bool, start: int, end: int, value_start: int) -> None:
+        self.name = name
+        self.value = value
+        self.positional = positional
+        self.start = start
+        self.end = end
+        self.value_start = value_start
+
+    def __repr__(self) -> str:
+        return f"Parameter({self.name!r}, {self.value!r})"
+
+
+class Template:
+    """
+    页面中的一个模板
+
+    Attributes:
+        name: 模板名称的原文，已去掉两侧空白
+        start: 模板在页面中的起始位置（“{{” 处）
+        end: 模板在页面中的结束位置（“}}” 之后）
+        name_start: 模板名称的起始位置
+        name_end: 模板名称的结束位置
+        params: 模板的参数，按出现的顺序排列
+        children: 直接嵌套在该模板中的模板和模板参数
+    """
+
+    __slots__ = ("name", "start", "end", "name_start", "name_end", "params", "children")
+
+    # 左右花括号的数量
+    braces = 2
+
+    def __init__(self, name: str, start: int, end: int, name_start: int, name_end: int,
+                 params: list[Parameter], children: list[Template]) -> None:
+        self.name = name
+        self.start = start
+        self.end = end
+        self.name_start = name_start
+        self.name_end = name_end
+        self.params = params
+        self.children = children
+
+    def get(self, name: str | int) -> Optional[Parameter]:
+        """
+        获取参数，同名参数以最后一个为准，与 MediaWiki 一致
+        :param name: 参数名，位置参数为其序号
+        :return: 参数，不存在时返回 None
+        """
+        name = str(name)
+        for param in reversed(self.params):
+            if param.name == name:
+                return param
+        return None
+
+    def __contains__(self, name: str | int) -> bool:
+        return self.get(name) is not None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {self.start}, {self.end})"
+
+
+class Argument(Template):
+    """
+    模板参数 {{{name|default}}}，name 为参数名，params 中至多有一个位置参数，即默认值
+    """
+
+    __slots__ = ()
+    braces = 3
+
+
+class Document:
+    """
+    解析后的页面
+
+    Attributes:
+        text: 页面原文
+        roots: 不嵌套在其他模板中的模板和模板参数，按出现的顺序排列
+        templates: 页面中所有的模板（不含模板参数），按起始位置排列
+        onlyinclude: 每个 <onlyinclude> 中内容的 (起始位置, 结束位置)
+    """
+
+    def __init__(self, text: str, roots: list[Template], onlyinclude: list[tuple[int, int]]) -> None:
+        self.text = text
+        self.roots = roots
+        self.onlyinclude = onlyinclude
+        self.templates: list[Template] = sorted(
+            (node for node in self.walk() if not isinstance(node, Argument)), key=lambda node: node.start
+        )
+        self._edits: list[tuple[int, int, str]] = []
+
+    def walk(self, nodes: Optional[list[Template]] = None):
+        """按先序遍历模板和模板参数"""
+        for node in self.roots if nodes is None else nodes:
+            yield node
+            yield from self.walk(node.children)
+
+    def find(self, name: str) -> list[Template]:
+        """
+        按名称查找模板，忽略首字母大小写和下划线与空格的区别，名称为模板参数时与其默认值比较
+        :param name: 模板名称
+        :return: 名称相同的模板，按起始位置排列
+        """
+        key = _name_key(name)
+        return [template for template in self.templates if _name_key(template.name) == key]
+
+    def set_param(self, template: Template, name: str | int, value: str) -> None:
+        """
+        修改模板参数的值，参数不存在时添加到模板末尾。修改会在调用 render 时一次性写入
+        :param template: 要修改的模板，需来自本页面
+        :param name: 参数名，位置参数为其序号
+        :param value: 新的参数值，会保留原参数值两侧的空白
+        """
+        param = template.get(name)
+        if param is not None:
+            raw = self.text[param.value_start:param.end]
+            lead = len(raw) - len(raw.lstrip())
+            trail = len(raw) - len(raw.rstrip())
+            self._edits.append((param.value_start + lead, param.end - trail, value))
+            return
+
+        position = template.end - template.braces
+        multiline = self.text[template.name_end:position].endswith("\n")
+        field = value if str(name).isdigit() else f"{name} = {value}" if multiline else f"{name}={value}"
+        self._edits.append((position, position, f"|{field}\n" if multiline else f"|{field}"))
+
+    def replace(self, start: int, end: int, text: str) -> None:
+        """
+        将原文中 [start, end) 的内容替换为 text，修改会在调用 render 时一次性写入
+        """
+        self._edits.append((start, end, text))
+
+    def render(self) -> str:
+        """
+        应用所有修改，返回新的页面文本
+        :return: 修改后的页面文本
+        """
+        parts: list[str] = []
+        pos = 0
+        for start, end, text in sorted(self._edits, key=lambda edit: (edit[0], edit[1])):
+            if start < pos:
+                raise ValueError(f"overlapping edits at position {start}!")
+            parts.append(self.text[pos:start])
+            parts.append(text)
+            pos = end
+        parts.append(self.text[pos:])
+        return "".join(parts)
+
+
+class _Open:
+    """解析过程中尚未闭合的花括号或方括号"""
+
+    __slots__ = ("char", "pos", "count", "pipes", "equals", "nodes")
+
+    def __init__(self, char: str, pos: int, count: int) -> None:
+        self.char = char
+        self.pos = pos
+        self.count = count
+        # 最外层 “|” 的位置，以及每个参数中第一个 “=” 的位置
+        self.pipes: list[int] = []
+        self.equals: dict[int, int] = {}
+        # 已闭合的、直接嵌套在其中的模板
+        self.nodes: list[Template] = []
+
+
+def parse(text: str) -> Document:
+    """
+    解析页面中的模板
+    :param text: 页面文本
+    :return: 解析后的页面
+    """
+    stack: list[_Open] = []
+    roots: list[Template] = []
+    onlyinclude: list[tuple[int, int]] = []
+    include_start: Optional[int] = None
+
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        char = token[0]
+
+        if char == "<":
+            if match.group(1) is None:
+                continue
+            if match.group(1) == "":
+                include_start = match.end()
+            elif include_start is not None:
+                onlyinclude.append((include_start, match.start()))
+                include_start = None
+
+        elif char == "{":
+            if len(token) >= 2:
+                stack.append(_Open("{", match.start(), len(token)))
+
+        elif char == "[":
+            stack.append(_Open("[", match.start(), 2))
+
+        elif char == "]":
+            if stack and stack[-1].char == "[":
+                _close_link(stack, roots)
+
+        elif char == "|":
+            if stack:
+                stack[-1].pipes.append(match.start())
+
+        elif char == "=":
+            if stack and stack[-1].char == "{" and stack[-1].pipes:
+                stack[-1].equals.setdefault(len(stack[-1].pipes), match.start())
+
+        else:
+            pos, remaining = match.start(), len(token)
+            while remaining >= 2 and stack and stack[-1].char == "{":
+                matched = _close_braces(text, stack, roots, pos, remaining)
+                pos += matched
+                remaining -= matched
+
+    # 未闭合的括号按普通文本处理，其中已闭合的模板归入最外层
+    if stack:
+        for element in stack:
+            roots.extend(element.nodes)
+        roots.sort(key=lambda node: node.start)
+
+    return Document(text, roots, onlyinclude)
+
+
+def _close_link(stack: list[_Open], roots: list[Template]) -> None:
+    """闭合链接，链接中的模板归入外层"""
+    link = stack.pop()
+    (stack[-1].nodes if stack else roots).extend(link.nodes)
+
+
+def _close_braces(text: str, stack: list[_Open], roots: list[Template], pos: int, count: int) -> int:
+    """
+    用 pos 处的 count 个右花括号闭合栈顶的左花括号
+    :return: 使用的右花括号数量
+    """
+    top = stack[-1]
+    matched = 3 if min(count, top.count) >= 3 else 2
+    start = top.pos + top.count - matched
+    content_start = top.pos + top.count
+    end = pos + matched
+
+    bounds = [content_start, *(pipe + 1 for pipe in top.pipes)]
+    ends = [*top.pipes, pos]
+    name_raw = text[bounds[0]:ends[0]]
+    name = name_raw.strip()
+    name_start = bounds[0] + len(name_raw) - len(name_raw.lstrip())
+
+    params: list[Parameter] = []
+    index = 0
+    for i in range(1, len(bounds)):
+        equals = top.equals.get(i)
+        if equals is None:
+            index += 1
+            params.append(Parameter(str(index), text[bounds[i]:ends[i]], True, bounds[i], ends[i], bounds[i]))
+        else:
+            params.append(Parameter(text[bounds[i]:equals].strip(), text[equals + 1:ends[i]], False,
+                                    bounds[i], ends[i], equals + 1))
+
+    node_type = Argument if matched == 3 else Template
+    node = node_type(name, start, end, name_start, name_start + len(name), params, top.nodes)
+
+    top.count -= matched
+    if top.count >= 2:
+        # 剩余的左花括号仍然有效，刚闭合的模板成为其名称的一部分
+        top.pipes, top.equals, top.nodes = [], {}, [node]
+    else:
+        stack.pop()
+        (stack[-1].nodes if stack else roots).append(node)
+    return matched
+
+
+def _name_key(name: str) -> str:
+    """模板名称的比较键"""
+    argument = _ARGUMENT_NAME.match(name)
+    if argument is not None:
+        name = argument.group(1)
+    name = name.strip().replace("_", " ")
+    return name[:1].upper() + name[1:]
+
+
+def normalize(text: str) -> str:
+    """
+    规范化 wikitext
+    :param text: 页面文本
+    :return: 规范化后的文本
+    """
+    text = text.replace("\r\n", "\n")
+    doc = parse(text)
+    text = _normalize_span(text, doc.roots, 0, len(text))
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def is_same(old: str, new: str) -> bool:
+    """
+    判断两段 wikitext 是否只有格式上的差异
+    :param old: wiki 上的当前文本
+    :param new: 新生成的文本
+    :return: 规范化后是否相同
+    """
+    return old == new or normalize(old) == normalize(new)
+
+
+def _normalize_span(text: str, nodes: list[Template], start: int, end: int) -> str:
+    """规范化 [start, end) 中的文本，nodes 为其中的模板"""
+    parts: list[str] = []
+    pos = start
+    for node in nodes:
+        if node.start < start or node.end > end:
+            continue
+        parts.append(text[pos:node.start])
+        parts.append(_normalize_node(text, node))
+        pos = node.end
+    parts.append(text[pos:end])
+    return "".join(parts)
+
+
+def _normalize_node(text: str, node: Template) -> str:
+    """规范化单个模板或模板参数"""
+    name_end = node.params[0].start - 1 if node.params else node.end - node.braces
+    name = _normalize_span(text, node.children, node.start + node.braces, name_end).strip()
+    if isinstance(node, Argument):
+        fields = [name, *(_normalize_span(text, node.children, param.start, param.end) for param in node.params)]
+        return "{{{" + "|".join(fields) + "}}}"
+
+    positional: list[str] = []
+    named: dict[str, str] = {}
+    for param in node.params:
+        value = _normalize_span(text, node.children, param.value_start, param.end)
+        if param.positional:
+            positional.append(value)
+        else:
+            named[param.name] = value.strip()
+    fields = [name, *positional, *(f"{key}={named[key]}" for key in sorted(named))]
+    return "{{" + "|".join(fields) + "}}"
@@ -0,0 +1,160 @@
+"""
+比较两个版本的游戏解包数据
+
+用法:
+    python -m src.Parsers.Version_diff 旧版本json目录 新版本json目录 [-o diff.json]
+
+对物品、大型物品、作物、果树、商店、配方、鱼和武器分别按 ID 比较，输出新增、删除的 ID 和每个变化条目的字段级差异。
+源文件内容完全相同时直接跳过，不进行解析；条目整体相同时也不会逐字段比较。
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from typing import Any
+
+from src.ItemService import GameData, json_cache
+from src.Utilities import FileUtils
+
+# 数据类型 -> (GameData 中的属性名, 文件名)，属性名为 None 的文件不属于 GameData，直接读取
+ENTITIES: dict[str, tuple[str | None, str]] = {
+    "objects": ("objects_data", "Objects.json"),
+    "big_craftables": ("bigcraftables_data", "BigCraftables.json"),
+    "crops": ("crops_data", "Crops.json"),
+    "fruit_trees": ("fruit_trees_data", "FruitTrees.json"),
+    "shops": ("shops_data", "Shops.json"),
+    "crafting_recipes": (None, "CraftingRecipes.json"),
+    "cooking_recipes": (None, "CookingRecipes.json"),
+    "fish": ("fish_data", "Fish.json"),
+    "weapons": ("weapon_data", "Weapons.json"),
+}
+
+# 以 “/” 分隔字段的字符串数据，按字段序号比较
+_SLASH_SEPARATED = ("crafting_recipes", "cooking_recipes", "fish")
+
+# 表示字段不存在的标记
+_MISSING = object()
+
+
+def diff_versions(old_dir: str | Path, new_dir: str | Path) -> dict[str, dict[str, Any]]:
+    """
+    比较两个版本的游戏数据
+    :param old_dir: 旧版本的 json 目录
+    :param new_dir: 新版本的 json 目录
+    :return: 数据类型 -> {"added": [...], "removed": [...], "changed": {ID: [字段差异, ...]}}
+    """
+    old_data = GameData(json_path=old_dir)
+    new_data = GameData(json_path=new_dir)
+
+    result: dict[str, dict[str, Any]] = {}
+    for entity, (attr, filename) in ENTITIES.items():
+        old_file = Path(old_dir) / filename
+        new_file = Path(new_dir) / filename
+        # 文件内容相同，无需解析
+        if old_file.exists() and new_file.exists() \
+                and FileUtils.get_file_hash(old_file) == FileUtils.get_file_hash(new_file):
+            result[entity] = {"added": [], "removed": [], "changed": {}}
+            continue
+
+        old_entries = _load(old_data, attr, old_file)
+        new_entries = _load(new_data, attr, new_file)
+        result[entity] = diff_entries(old_entries, new_entries, split=entity in _SLASH_SEPARATED)
+
+    return result
+
+
+def diff_entries(old: dict[str, Any], new: dict[str, Any], split: bool = False) -> dict[str, Any]:
+    """
+    按 ID 比较同一类型的两组数据
+    :param old: 旧版本的数据，ID -> 条目
+    :param new: 新版本的数据，ID -> 条目
+    :param split: 条目是否为以 “/” 分隔字段的字符串
+    :return: {"added": [...], "removed": [...], "changed": {ID: [字段差异, ...]}}
+    """
+    added = [key for key in new if key not in old]
+    removed = [key for key in old if key not in new]
+    changed: dict[str, list[dict[str, Any]]] = {}
+    for key, old_entry in old.items():
+        if key not in new:
+            continue
+        new_entry = new[key]
+        # 条目整体相同时跳过，dict 的比较在遇到第一个不同之处时即停止
+        if old_entry == new_entry:
+            continue
+        if split and isinstance(old_entry, str) and isinstance(new_entry, str):
+            old_entry, new_entry = old_entry.split("/"), new_entry.split("/")
+        changes: list[dict[str, Any]] = []
+        _diff_value(old_entry, new_entry, "", changes)
+        changed[key] = changes
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def _load(data: GameData, attr: str | None, filepath: Path) -> dict[str, Any]:
+    """读取一个版本中某一类型的数据，文件不存在时视为空"""
+    if not filepath.exists():
+        return {}
+    if attr is None:
+        return json_cache.read(filepath)
+    return getattr(data, attr)
+
+
+def _diff_value(old: Any, new: Any, path: str, changes: list[dict[str, Any]]) -> None:
+    """
+    递归比较两个值，将字段级差异追加到 changes 中
+    :param old: 旧值，_MISSING 表示不存在
+    :param new: 新值，_MISSING 表示不存在
+    :param path: 当前值的路径，例如 Items[Id=Pierre].Price
+    :param changes: 差异列表，每一项为 {"path": 路径, "old": 旧值, "new": 新值}，不存在的一侧省略
+    """
+    if old == new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in [*old, *(k for k in new if k not in old)]:
+            _diff_value(old.get(key, _MISSING), new.get(key, _MISSING), f"{path}.{key}" if path else str(key), changes)
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        # 带有 Id 的条目列表（例如商店的 Items）按 Id 匹配，否则按序号匹配
+        if _is_keyed_list(old) and _is_keyed_list(new):
+            old_items = {item["Id"]: item for item in old}
+            new_items = {item["Id"]: item for item in new}
+            for key in [*old_items, *(k for k in new_items if k not in old_items)]:
+                _diff_value(old_items.get(key, _MISSING), new_items.get(key, _MISSING), f"{path}[Id={key}]", changes)
+        else:
+            for i in range(max(len(old), len(new))):
+                _diff_value(old[i] if i < len(old) else _MISSING, new[i] if i < len(new) else _MISSING,
+                            f"{path}[{i}]", changes)
+        return
+
+    change: dict[str, Any] = {"path": path}
+    if old is not _MISSING:
+        change["old"] = old
+    if new is not _MISSING:
+        change["new"] = new
+    changes.append(change)
+
+
+def _is_keyed_list(items: list) -> bool:
+    """判断列表是否由 Id 互不相同的字典组成"""
+    if not items or not all(isinstance(item, dict) and "Id" in item for item in items):
+        return False
+    return len({item["Id"] for item in items}) == len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="比较两个版本的游戏解包数据")
+    parser.add_argument("old_dir", type=Path, help="旧版本的 json 目录")
+    parser.add_argument("new_dir", type=Path, help="新版本的 json 目录")
+    parser.add_argument("-o", "--output", type=Path, help="差异的保存路径，留空则只打印摘要")
+    args = parser.parse_args()
+
+    result = diff_versions(args.old_dir, args.new_dir)
+    for entity, diff in result.items():
+        print(f"[{entity}] 新增 {len(diff['added'])}，删除 {len(diff['removed'])}，变化 {len(diff['changed'])}")
+    if args.output is not None:
+        FileUtils.write_json(result, args.output)
+        print(f"差异已保存至 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,43 @@
 from __future__ import annotations
 import datetime
+import io
 import os
-from typing import override
+import shutil
+import struct
+import threading
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional, Union, override
 
-from PIL import Image, ImageDraw
+import numpy as np
+from PIL import GifImagePlugin, Image
 from PIL.Image import Resampling
 
+from src.Utilities import FileUtils
+
+# 低于该不透明度的像素在 gif 中视为透明
+GIF_ALPHA_THRESHOLD = 128
+
+# 优化 png 时尝试的 zlib 压缩策略
+PNG_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)
+
+# 可以无损优化的 png 模式，其余模式（例如 16 位灰度的 I;16）转换为 8 位会丢失数据，保持原样
+PNG_OPTIMIZABLE_MODES = ("L", "LA", "RGB", "RGBA", "P")
+
+# 输出超过该像素数的图片时按行分块缩放并逐块写入，避免一次性生成整张大图
+LARGE_IMAGE_PIXELS = 4096 * 4096
+
+# 分块缩放时每块输出的默认行数
+STRIP_HEIGHT = 256
+
+# 处理结果缓存的默认目录
+CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "pictures"
+
+# 记录当前线程中 _save 保存的 (文件名, 是否由输入文件名得到)，用于去重和缓存处理结果
+_recorder = threading.local()
+
 
 class Vector2:
     def __init__(self, x, y) -> None:
@@ -59,30 +91,229 @@ class Vector2:
 
 
 class PictureProcessor:
-    def __init__(self, clearInputDir=False):
+    def __init__(self, clearInputDir=False, workers: int = 1, use_processes: bool = False, use_cache: bool = False,
+                 cache_dir: Union[str, Path] = CACHE_DIR):
+        """
+        :param clearInputDir: 运行完成后是否清除 pics 文件夹内的图片
+        :param workers: 同时处理的图片数量，为 1 时逐张处理
+        :param use_processes: 是否使用多进程并行处理，默认使用多线程（Pillow 在编解码时会释放 GIL）
+        :param use_cache: 是否缓存处理结果，输入图片和操作参数都相同时直接从缓存复制结果
+        :param cache_dir: 处理结果的缓存目录
+        """
         self.pictures: list[str] = os.listdir("pics")
         self.output_dir = "output/" + datetime.datetime.now().strftime("%y%m%d_%H%M%S")
         self.clear_input = clearInputDir
+        self.workers = workers
+        self.use_processes = use_processes
+        # 最近一次批量处理中失败的图片及其错误信息
+        self.errors: dict[str, str] = {}
+        self.cache: Optional[ResultCache] = ResultCache(cache_dir) if use_cache else None
         os.makedirs(self.output_dir, exist_ok=True)
 
     def _update(self):
         self.pictures = os.listdir("pics")
 
-    def resize_pic(self, scale: float = 3.0, cover=False) -> None:
+    def _run(self, task: Callable[[str], Any], pictures: Optional[list[str]] = None,
+             report: bool = True) -> dict[str, Any]:
+        """
+        对每张图片执行 task，workers 大于 1 时并行执行。
+        单张图片处理失败不会中断其余图片，全部完成后按图片顺序打印失败的图片，错误信息记录在 errors 中
+        :param task: 处理单张图片的函数，参数为图片文件名
+        :param pictures: 需要处理的图片，默认为 pics 文件夹内的全部图片
+        :param report: 是否打印失败的图片，为 False 时由调用方补充 errors 后再调用 _report_errors
+        :return: 处理成功的图片 -> task 的返回值
+        """
+        pictures = self.pictures if pictures is None else pictures
+        self.errors = {}
+        results: dict[str, Any] = {}
+        if self.workers <= 1:
+            for pic in pictures:
+                try:
+                    results[pic] = task(pic)
+                except Exception as error:
+                    self.errors[pic] = f"{type(error).__name__}: {error}"
+        else:
+            executor: Executor = (ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor)(self.workers)
+            with executor:
+                futures = [(pic, executor.submit(task, pic)) for pic in pictures]
+            for pic, future in futures:
+                error = future.exception()
+                if error is not None:
+                    self.errors[pic] = f"{type(error).__name__}: {error}"
+                else:
+                    results[pic] = future.result()
+
+        if report:
+            self._report_errors(len(pictures))
+        return results
+
+    def _report_errors(self, total: int) -> None:
+        """
+        打印失败的图片
+        :param total: 输入图片的总数
+        """
+        for pic, error in self.errors.items():
+            print(f"[失败] {pic}：{error}")
+        if self.errors:
+            print(f"共 {total} 张图片，{len(self.errors)} 张处理失败")
+
+    def _run_outputs(self, task: Callable[[str], Any], operation: tuple, cover: bool) -> None:
+        """
+        执行输出至 output 文件夹的操作。内容相同的输入图片只处理一次，其余图片直接复制结果并按各自的文件名重命名；
+        启用缓存时，输入图片和操作参数都与之前相同的图片会直接从缓存中复制结果
+        :param task: 处理单张图片的函数，参数为图片文件名
+        :param operation: 操作名称及参数，作为缓存键的一部分
+        :param cover: 是否覆盖原图片，为 True 时不去重也不使用缓存
+        """
+        if cover:
+            self._run(task)
+            return
+
+        hashes = {pic: FileUtils.get_file_hash(f"pics/{pic}") for pic in self.pictures}
+        representatives: dict[str, str] = {}
+        for pic, file_hash in hashes.items():
+            representatives.setdefault(file_hash, pic)
+
+        outputs = self._run(partial(self._cached_task, task=task, operation=operation, hashes=hashes),
+                            list(representatives.values()), report=False)
+        errors = self.errors
+        for pic, file_hash in hashes.items():
+            source = representatives[file_hash]
+            if source == pic:
+                continue
+            if source in errors:
+                errors[pic] = errors[source]
+                continue
+            source_stem, stem = os.path.splitext(source)[0], os.path.splitext(pic)[0]
+            for name, by_input in outputs[source]:
+                # 由输入文件名得到的结果按当前图片重命名，其余结果（例如以物品 ID 命名的图块）与原结果相同，无需复制
+                if by_input:
+                    shutil.copyfile(f"{self.output_dir}/{name}", f"{self.output_dir}/{stem}{name[len(source_stem):]}")
+        # 失败的图片按输入顺序排列，数量按去重前的全部输入图片统计
+        self.errors = {pic: errors[pic] for pic in self.pictures if pic in errors}
+        self._report_errors(len(self.pictures))
+
+    def _cached_task(self, pic: str, task: Callable[[str], Any], operation: tuple,
+                     hashes: dict[str, str]) -> list[tuple[str, bool]]:
+        """
+        处理单张图片，启用缓存时优先从缓存中复制结果
+        :return: 输出的 (文件名, 是否由输入文件名得到)
+        """
+        stem = os.path.splitext(pic)[0]
+        key = self.cache.key(hashes[pic], operation) if self.cache is not None else None
+        if key is not None:
+            outputs = self.cache.restore(key, stem, self.output_dir)
+            if outputs is not None:
+                return outputs
+
+        _recorder.outputs = []
+        try:
+            task(pic)
+            outputs = _recorder.outputs
+        finally:
+            _recorder.outputs = None
+
+        if key is not None:
+            self.cache.store(key, stem, self.output_dir, outputs)
+        return outputs
+
+    def resize_pic(self, scale: float = 3.0, cover=False, strip_height: Optional[int] = None) -> None:
         """
         遍历 pic 文件夹内的所有图片，使用硬边缘缩放图片尺寸，使像素图片更适合用于显示，默认缩放比例为 3.0
+
+        分块缩放时每次只生成 strip_height 行输出并立即压缩写入 png，内存中只保留原图和一块输出，
+        适合地图等放大后过大的图片。结果的像素与整张缩放完全相同。
+        PngWriter 不支持的模式（例如 16 位灰度）仍整张缩放，以免损失精度
         :param scale: 缩放比例
         :param cover: 是否覆盖原图片，若为 True 则会直接在原图上操作，否则输出至 output文件夹
+        :param strip_height: 分块缩放时每块输出的行数，为 0 时不分块；
+                             默认仅在输出超过 LARGE_IMAGE_PIXELS 像素时分块，每块 STRIP_HEIGHT 行
         """
-        for pic in self.pictures:
-            image: Image = Image.open(f"pics/{pic}")
+        self._run_outputs(partial(self._resize_one, scale=scale, cover=cover, strip_height=strip_height),
+                          ("resize_pic", scale), cover)
+
+    def _resize_one(self, pic: str, scale: float, cover: bool, strip_height: Optional[int] = None) -> None:
+        with Image.open(f"pics/{pic}") as image:
             original_size = image.size
             new_size = (int(original_size[0] * scale), int(original_size[1] * scale))
-            resized_image = image.resize(new_size, Resampling.NEAREST)
-            if cover:
-                resized_image.save(f"pics/{pic}")
-                continue
-            self._save(resized_image, pic)
+            if strip_height is None:
+                strip_height = STRIP_HEIGHT if new_size[0] * new_size[1] > LARGE_IMAGE_PIXELS else 0
+            # 分块写入只支持 png 和 PngWriter 支持的模式，其他情况仍整张缩放
+            if (cover and not pic.lower().endswith(".png")) or image.mode not in PngWriter.COLOR_TYPES:
+                strip_height = 0
+            if strip_height > 0:
+                pixels, mode, params = self._png_pixels(image)
+            else:
+                resized_image = image.resize(new_size, Resampling.NEAREST)
+        if strip_height > 0:
+            self._resize_strips(pixels, new_size, f"pics/{pic}" if cover else f"{self.output_dir}/{pic}",
+                                strip_height, mode, **params)
+            if not cover:
+                self._record(pic)
+            return
+        if cover:
+            resized_image.save(f"pics/{pic}")
+            return
+        self._save(resized_image, pic)
+
+    @staticmethod
+    def _png_pixels(image: Image) -> tuple[np.ndarray, str, dict[str, Optional[bytes]]]:
+        """
+        读取图片的像素，调色板图片保留调色板
+        :param image: 原图，模式须为 PngWriter.COLOR_TYPES 之一
+        :return: ((高, 宽, 通道数) 的数组, 模式, PngWriter 的调色板参数)
+        """
+        params: dict[str, Optional[bytes]] = {}
+        if image.mode == "P":
+            params["palette"] = bytes(image.getpalette() or [])
+            transparency = image.info.get("transparency")
+            if isinstance(transparency, int):
+                transparency = bytes(255 if i != transparency else 0 for i in range(transparency + 1))
+            params["transparency"] = transparency
+        pixels = np.asarray(image)
+        return pixels.reshape(pixels.shape[0], pixels.shape[1], -1), image.mode, params
+
+    @staticmethod
+    def _nearest_indices(source: int, target: int) -> np.ndarray:
+        """
+        计算硬边缘缩放时每个输出像素对应的原图坐标，与 Pillow 的 NEAREST 缩放逐项累加的计算方式一致
+        :param source: 原图的边长
+        :param target: 输出的边长
+        """
+        step = source / target
+        positions = np.cumsum(np.r_[0.5 * step, np.full(target - 1, step)])
+        return np.minimum(positions.astype(np.intp), source - 1)
+
+    @staticmethod
+    def _resize_strips(pixels: np.ndarray, new_size: tuple[int, int], filepath: str, strip_height: int, mode: str,
+                       palette: Optional[bytes] = None, transparency: Optional[bytes] = None) -> None:
+        """
+        分块进行硬边缘缩放，并逐块写入 png。先写入临时文件，完成后再替换目标文件
+        :param pixels: (高, 宽, 通道数) 的原图像素
+        :param new_size: 输出尺寸 (宽, 高)
+        :param filepath: 输出路径
+        :param strip_height: 每块输出的行数
+        :param mode: 图片模式
+        """
+        height, width, channels = pixels.shape
+        temp_path = f"{filepath}.part"
+        with open(temp_path, "wb") as fp:
+            writer = PngWriter(fp, new_size, mode, palette, transparency)
+            scale = new_size[0] // width
+            if new_size == (width * scale, height * scale):
+                # 整数倍放大：每块取若干原图行，通过广播视图重复像素，只在写入时复制一次
+                rows = max(1, strip_height // scale)
+                for top in range(0, height, rows):
+                    strip = pixels[top:top + rows, None, :, None, :]
+                    strip = np.broadcast_to(strip, (strip.shape[0], scale, width, scale, channels))
+                    writer.write_rows(strip.reshape(-1, new_size[0], channels))
+            else:
+                ys = PictureProcessor._nearest_indices(height, new_size[1])
+                xs = PictureProcessor._nearest_indices(width, new_size[0])
+                for top in range(0, new_size[1], strip_height):
+                    writer.write_rows(pixels[ys[top:top + strip_height]][:, xs])
+            writer.close()
+        os.replace(temp_path, filepath)
 
     def divide_pic(self, cutRange: tuple[int, int, int, int], cover=False) -> None:
         """
@@ -90,13 +321,15 @@ class PictureProcessor:
         :param cutRange: 裁剪范围，格式为：[左上角 x, 左上角 y, 右下角 x, 右下角 y]
         :param cover: 是否覆盖原图片，若为 True 则会直接在原图上操作，否则输出至 output文件夹
         """
-        for pic in self.pictures:
-            image: Image = Image.open(f"pics/{pic}")
+        self._run_outputs(partial(self._divide_one, cutRange=cutRange, cover=cover), ("divide_pic", cutRange), cover)
+
+    def _divide_one(self, pic: str, cutRange: tuple[int, int, int, int], cover: bool) -> None:
+        with Image.open(f"pics/{pic}") as image:
             roi = image.crop(cutRange)
-            if cover:
-                roi.save(f"pics/{pic}")
-                continue
-            self._save(roi, pic)
+        if cover:
+            roi.save(f"pics/{pic}")
+            return
+        self._save(roi, pic)
 
     def divide_by_width(self, region_width: int, cover=False) -> None:
         """
@@ -104,8 +337,12 @@ class PictureProcessor:
         :param region_width: 每个区域的宽度（像素）
         :param cover: 是否覆盖原图片，若为 True 则会直接在原目录中操作，否则输出至 output文件夹
         """
-        for pic in self.pictures:
-            image: Image = Image.open(f"pics/{pic}")
+        self._run_outputs(partial(self._divide_by_width_one, region_width=region_width, cover=cover),
+                          ("divide_by_width", region_width), cover)
+        self._update()
+
+    def _divide_by_width_one(self, pic: str, region_width: int, cover: bool) -> None:
+        with Image.open(f"pics/{pic}") as image:
             img_width, img_height = image.size
             count = 1
             for left in range(0, img_width, region_width):
@@ -120,9 +357,8 @@ class PictureProcessor:
                 else:
                     self._save(region, region_filename)
                 count += 1
-            if cover:
-                os.remove(f"pics/{pic}")
-        self._update()
+        if cover:
+            os.remove(f"pics/{pic}")
 
     def divide_by_height(self, region_height: int, cover=False) -> None:
         """
@@ -130,8 +366,12 @@ class PictureProcessor:
         :param region_height: 每个区域的高度（像素）
         :param cover: 是否覆盖原图片，若为 True 则会直接在原目录中操作，否则输出至 output文件夹
         """
-        for pic in self.pictures:
-            image: Image = Image.open(f"pics/{pic}")
+        self._run_outputs(partial(self._divide_by_height_one, region_height=region_height, cover=cover),
+                          ("divide_by_height", region_height), cover)
+        self._update()
+
+    def _divide_by_height_one(self, pic: str, region_height: int, cover: bool) -> None:
+        with Image.open(f"pics/{pic}") as image:
             img_width, img_height = image.size
             count = 1
             for top in range(0, img_height, region_height):
@@ -146,9 +386,8 @@ class PictureProcessor:
                 else:
                     self._save(region, region_filename)
                 count += 1
-            if cover:
-                os.remove(f"pics/{pic}")
-        self._update()
+        if cover:
+            os.remove(f"pics/{pic}")
 
     def divide_by_region(self, region_height: int, region_width: int, cover=False) -> None:
         """
@@ -157,8 +396,12 @@ class PictureProcessor:
         :param region_width: 每个区域的宽度（像素）
         :param cover: 是否覆盖原图片，若为 True 则会直接在原目录中操作，否则输出至 output文件夹
         """
-        for pic in self.pictures:
-            image: Image = Image.open(f"pics/{pic}")
+        self._run_outputs(partial(self._divide_by_region_one, region_height=region_height, region_width=region_width,
+                                  cover=cover), ("divide_by_region", region_height, region_width), cover)
+        self._update()
+
+    def _divide_by_region_one(self, pic: str, region_height: int, region_width: int, cover: bool) -> None:
+        with Image.open(f"pics/{pic}") as image:
             img_width, img_height = image.size
             count = 1
             for top in range(0, img_height, region_height):
@@ -178,18 +421,109 @@ class PictureProcessor:
                     else:
                         self._save(region, region_filename)
                     count += 1
-            if cover:
-                os.remove(f"pics/{pic}")
+        if cover:
+            os.remove(f"pics/{pic}")
+
+    def slice_sheet(self, tile_height: int = 16, tile_width: int = 16, skip_empty: bool = True,
+                    name_by_id: bool = False, texture: Optional[str] = None, cover=False) -> None:
+        """
+        将精灵图按固定尺寸切分为图块，跳过完全透明的图块。与 divide_by_region 相比，
+        图片会被视为 (行, 列, 高, 宽, 通道) 的数组（不复制像素），所有图块是否为空在一次数组运算中得出。
+        与 divide_by_region 一样，不足一个图块的右侧和下侧边缘会输出为较小的图块，图块的序号也与其一致
+        :param tile_height: 图块高度（像素），默认为 16
+        :param tile_width: 图块宽度（像素），默认为 16
+        :param skip_empty: 是否跳过完全透明的图块
+        :param name_by_id: 是否以图块对应的物品 ID 命名，没有对应物品的图块仍使用序号命名
+        :param texture: name_by_id 为 True 时使用的贴图路径，例如 TileSheets\\Objects_2，留空则为 springobjects
+        :param cover: 是否覆盖原图片，若为 True 则会直接在原目录中操作，否则输出至 output文件夹
+        """
+        sprite_ids: dict[int, str] = {}
+        if name_by_id:
+            from src.ItemService import game_data
+            sprite_ids = game_data.get_sprite_ids(texture)
+
+        self._run_outputs(partial(self._slice_sheet_one, tile_height=tile_height, tile_width=tile_width,
+                                  skip_empty=skip_empty, sprite_ids=sprite_ids, cover=cover),
+                          ("slice_sheet", tile_height, tile_width, skip_empty, name_by_id, texture), cover)
         self._update()
 
-    def add_mask(self, region_lists: list[str], color, tile_width: int = 16, cover=False) -> None:
+    def _slice_sheet_one(self, pic: str, tile_height: int, tile_width: int, skip_empty: bool,
+                         sprite_ids: dict[int, str], cover: bool) -> None:
+        with Image.open(f"pics/{pic}") as image:
+            pixels = np.asarray(image.convert("RGBA"))
+        height, width = pixels.shape[:2]
+        rows, cols = -(-height // tile_height), -(-width // tile_width)
+        if (rows * tile_height, cols * tile_width) != (height, width):
+            # 以透明像素补齐边缘，使边缘的图块也能参与数组运算，输出时再裁回原来的大小
+            pixels = np.pad(pixels, ((0, rows * tile_height - height), (0, cols * tile_width - width), (0, 0)))
+        tiles = self._as_tiles(pixels, tile_height, tile_width)
+        if skip_empty:
+            occupied = tiles[..., 3].any(axis=(2, 3))
+        else:
+            occupied = np.ones((rows, cols), dtype=bool)
+
+        name, ext = os.path.splitext(pic)
+        for row, col in zip(*np.nonzero(occupied)):
+            index = int(row * cols + col)
+            # 序号与 divide_by_region 一致，从 1 开始，被跳过的图块也会占用序号
+            tile_name = sprite_ids.get(index, f"{name} {index + 1}")
+            region = Image.fromarray(tiles[row, col, :height - row * tile_height, :width - col * tile_width])
+            if cover:
+                region.save(f"pics/{tile_name}{ext}")
+            else:
+                self._save(region, f"{tile_name}{ext}", by_input=index not in sprite_ids)
+        if cover:
+            os.remove(f"pics/{pic}")
+
+    @staticmethod
+    def _as_tiles(pixels: np.ndarray, tile_height: int, tile_width: int) -> np.ndarray:
         """
-        获取 pic 文件夹内的第一张图片，在其之上绘制图片遮罩
-        :param region_lists: 遮罩的范围，格式为：["int,int;int,int", ...]
-        :param color: 遮罩的 RGBA
+        将 (高, 宽, 通道) 的像素数组视为 (行, 列, 图块高, 图块宽, 通道) 的图块数组，不复制像素，
+        不足一个图块的右侧和下侧边缘会被忽略
+        :param pixels: 像素数组
+        :param tile_height: 图块高度
+        :param tile_width: 图块宽度
+        :return: 图块数组
+        """
+        height, width, channels = pixels.shape
+        rows, cols = height // tile_height, width // tile_width
+        row_stride, col_stride, channel_stride = pixels.strides
+        return np.lib.stride_tricks.as_strided(
+            pixels,
+            shape=(rows, cols, tile_height, tile_width, channels),
+            strides=(row_stride * tile_height, col_stride * tile_width, row_stride, col_stride, channel_stride),
+            writeable=False
+        )
+
+    def add_mask(self, region_lists: list[str | tuple[str, tuple]], color=None, tile_width: int = 16,
+                 cover=False) -> None:
+        """
+        遍历 pic 文件夹内的所有图片，在其之上绘制图片遮罩。所有图片共用同一组遮罩，遮罩只会与被覆盖的像素混合
+        :param region_lists: 遮罩的范围，格式为：["int,int;int,int", ...]，
+                             也可以为单个范围指定颜色：[("int,int;int,int", (r, g, b, a)), ...]
+        :param color: 未单独指定颜色的范围所使用的 RGBA
         :param tile_width: 图块宽度，默认为 16
         :param cover: 是否覆盖原图片，若为 True 则会直接在原图上操作，否则输出至 output文件夹
         """
+        mask = RegionMask.parse(region_lists, color, tile_width)
+        self._run_outputs(partial(self._mask_one, mask=mask, cover=cover), ("add_mask", mask), cover)
+
+    def _mask_one(self, pic: str, mask: RegionMask, cover: bool) -> None:
+        with Image.open(f"pics/{pic}") as image:
+            image = mask.apply(image)
+        if cover:
+            image.save(f"pics/{pic}")
+            return
+        self._save(image, pic)
+
+    @staticmethod
+    def _parse_regions(region_lists: list[str], tile_width: int) -> list[tuple[Vector2, Vector2]]:
+        """
+        将地块坐标形式的遮罩范围解析为像素坐标
+        :param region_lists: 遮罩的范围，格式为：["int,int;int,int", ...]
+        :param tile_width: 图块宽度
+        :return: 每个范围的 (左上角, 右下角) 像素坐标
+        """
         regions: list[tuple[Vector2, Vector2]] = []
         for region in region_lists:
             # 先进行预处理，使用分号分隔前后两个坐标值，然后解析两个坐标
@@ -202,42 +536,163 @@ class PictureProcessor:
             point0 = point0 * tile_width
             point1 = (point1 + 1) * tile_width
             regions.append((point0, point1))
-        # 只读取一张图片进行操作
-        pic = self.pictures[0]
-        image = Image.open(f"pics/{pic}").convert("RGBA")
-        # 新建一个透明图层
-        mask_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(mask_layer)
-        # 将范围遮罩绘制在透明图层上
-        for region in regions:
-            region = (region[0].x, region[0].y, region[1].x, region[1].y)
-            draw.rectangle(region, fill=color)
-        # 混合原图与遮罩图层
-        image = Image.alpha_composite(image, mask_layer)
-        if cover:
-            image.save(f"pics/{pic}")
-            return
-        self._save(image, pic)
+        return regions
+
+    def pipeline(self) -> Pipeline:
+        """
+        创建一个图片处理流水线，例如：
+        processor.pipeline().crop((0, 0, 64, 64)).resize(3).run()
+        :return: 绑定到当前实例的流水线
+        """
+        return Pipeline(self)
 
     def pngs2gif(self, duration: int = 300, group_length: int = 256) -> None:
         """
-        遍历 pic 文件夹内的所有图片，生成 gif 动图。
+        按文件名顺序遍历 pic 文件夹内的所有图片，每 group_length 张生成一个 gif 动图，以组内第一张图片命名。
+        帧会被逐个读取、编码并写入文件，同一时间只有两帧在内存中；所有帧共用一个调色板，
+        连续的相同帧会合并为一帧并累加显示时间。
+        :param duration: 每帧的显示时间（毫秒）
+        :param group_length: 每个 gif 最多包含的帧数
         """
-        for group_index in range(0, len(self.pictures), group_length):
+        # 按文件名排序，保证帧的顺序与文件名一致
+        pictures = sorted(self.pictures)
+        for group_index in range(0, len(pictures), group_length):
             # 获取当前组的图片路径
-            group_pics = min(len(self.pictures), group_index + group_length)
-            group = self.pictures[group_index:group_pics]
-            # 准备当前组的帧列表
-            frames = []
-            name = None
-            for frame in group:
-                if name is None:
-                    name = os.path.splitext(frame)[0]
-                frame = Image.open(f"pics/{frame}")
-                frames.append(frame)
-                # 生成当前组的GIF
-                frames[0].save(f"{self.output_dir}/{name}.gif", save_all=True, append_images=frames[1:],
-                               loop=0, disposal=2, transparency=0, duration=duration)
+            group = pictures[group_index:group_index + group_length]
+            name = os.path.splitext(group[0])[0]
+            self._build_gif(group, f"{self.output_dir}/{name}.gif", duration)
+
+    def _build_gif(self, group: list[str], filepath: str, duration: int) -> None:
+        """
+        将一组图片写入 gif，第一遍只统计颜色以生成共用的调色板，第二遍逐帧编码写入
+        :param group: 图片文件名，按帧的顺序排列
+        :param filepath: gif 的保存路径
+        :param duration: 每帧的显示时间（毫秒）
+        """
+        with Image.open(f"pics/{group[0]}") as first:
+            size = first.size
+        palette = GifPalette.from_frames(self._gif_frames(group, size))
+
+        with open(filepath, "wb") as fp:
+            writer = GifWriter(fp, size, palette.colors)
+            previous: Optional[np.ndarray] = None
+            previous_duration = 0
+            for frame in self._gif_frames(group, size):
+                indices = palette.index(frame)
+                if previous is not None and np.array_equal(previous, indices):
+                    previous_duration += duration
+                    continue
+                if previous is not None:
+                    writer.write_frame(previous, previous_duration)
+                previous, previous_duration = indices, duration
+            if previous is not None:
+                writer.write_frame(previous, previous_duration)
+            writer.close()
+
+    @staticmethod
+    def _gif_frames(group: list[str], size: tuple[int, int]):
+        """
+        逐个读取图片并转换为 (高, 宽, 4) 的 RGBA 数组，尺寸与第一帧不同的图片会被裁剪或以透明像素补齐
+        """
+        width, height = size
+        for pic in group:
+            with Image.open(f"pics/{pic}") as image:
+                pixels = np.asarray(image.convert("RGBA"))
+            if pixels.shape[:2] != (height, width):
+                canvas = np.zeros((height, width, 4), dtype=np.uint8)
+                h, w = min(height, pixels.shape[0]), min(width, pixels.shape[1])
+                canvas[:h, :w] = pixels[:h, :w]
+                pixels = canvas
+            yield pixels
+
+    def optimize_outputs(self, directory: Optional[str] = None) -> dict[str, tuple[int, int]]:
+        """
+        无损优化输出文件夹内的所有 png 图片，以减小上传至 Wiki 的文件体积：
+        颜色不超过 256 种的图片转换为索引色，完全不透明的图片去掉透明通道，去掉所有元数据，
+        并尝试多种 zlib 压缩策略，只有体积变小时才会覆盖原文件
+        :param directory: 需要优化的文件夹，默认为当前实例的输出文件夹
+        :return: 文件名 -> (优化前字节数, 优化后字节数)
+        """
+        directory = self.output_dir if directory is None else directory
+        files = sorted(file for file in os.listdir(directory) if file.lower().endswith(".png"))
+        results = self._run(partial(_optimize_in, directory), files)
+
+        before = sum(size[0] for size in results.values())
+        after = sum(size[1] for size in results.values())
+        if before:
+            print(f"共优化 {len(results)} 张图片，{before} → {after} 字节，节省 {before - after} 字节"
+                  f"（{(before - after) / before:.1%}）")
+        return results
+
+    @staticmethod
+    def optimize_png(filepath: str) -> tuple[int, int]:
+        """
+        无损优化单张 png 图片，体积变小时覆盖原文件。
+        只处理位深度不超过 8 且模式在 PNG_OPTIMIZABLE_MODES 中的图片，并在覆盖前确认结果与原图解码后的像素完全相同
+        :param filepath: 图片路径
+        :return: (优化前字节数, 优化后字节数)
+        """
+        before = os.path.getsize(filepath)
+        with Image.open(filepath) as image:
+            # Pillow 读取 16 位的 RGB(A) 图片时会直接降为 8 位，因此还需要检查文件头中的位深度
+            if image.format != "PNG" or image.mode not in PNG_OPTIMIZABLE_MODES or \
+                    PictureProcessor._png_bit_depth(filepath) > 8:
+                return before, before
+            # 调色板图片的候选图片可能使用不同的调色板，转换为 RGBA 后再比较
+            compare_mode = "RGBA" if image.mode == "P" else image.mode
+            original = np.asarray(image.convert(compare_mode))
+            pixels = np.asarray(image.convert("RGBA"))
+
+        best: Optional[bytes] = None
+        for candidate, params in PictureProcessor._png_candidates(pixels):
+            for strategy in PNG_STRATEGIES:
+                buffer = io.BytesIO()
+                candidate.save(buffer, format="PNG", compress_level=9, compress_type=strategy, **params)
+                if best is None or buffer.tell() < len(best):
+                    best = buffer.getvalue()
+
+        if best is None or len(best) >= before:
+            return before, before
+        with Image.open(io.BytesIO(best)) as optimized:
+            if not np.array_equal(np.asarray(optimized.convert(compare_mode)), original):
+                return before, before
+        with open(filepath, "wb") as fp:
+            fp.write(best)
+        return before, len(best)
+
+    @staticmethod
+    def _png_bit_depth(filepath: str) -> int:
+        """读取 png 文件头 IHDR 块中的位深度"""
+        with open(filepath, "rb") as fp:
+            header = fp.read(25)
+        return header[24]
+
+    @staticmethod
+    def _png_candidates(pixels: np.ndarray):
+        """
+        生成与原图像素完全相同、不含元数据的候选图片
+        :param pixels: (高, 宽, 4) 的 RGBA 数组
+        :return: (候选图片, 保存时的额外参数) 的迭代器
+        """
+        opaque = bool((pixels[..., 3] == 255).all())
+        yield Image.fromarray(np.ascontiguousarray(pixels[..., :3]) if opaque else pixels), {}
+
+        flat = pixels.reshape(-1, 4)
+        keys = flat.view(np.uint32).ravel()
+        colors, indices = np.unique(keys, return_inverse=True)
+        if len(colors) > 256:
+            return
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        # 透明度不为 255 的颜色排在前面，使 tRNS 块尽可能短
+        order = np.argsort(palette[:, 3] == 255, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        palette = palette[order]
+
+        indexed = Image.fromarray(rank[indices].astype(np.uint8).reshape(pixels.shape[:2]), "L")
+        indexed.putpalette(palette[:, :3].tobytes())
+        translucent = int((palette[:, 3] != 255).sum())
+        yield indexed, {"transparency": palette[:translucent, 3].tobytes()} if translucent else {}
 
     def select(self, ends_with: str = None) -> None:
         """
@@ -255,13 +710,22 @@ class PictureProcessor:
                 os.remove(f"pics/{pic}")
         self._update()
 
-    def _save(self, image: Image, filename: str) -> None:
+    def _save(self, image: Image, filename: str, by_input: bool = True) -> None:
         """
         将图片保存至输出文件夹下
         :param image: 需要保存的图片
         :param filename: 保存的文件名
+        :param by_input: 文件名是否由输入图片的文件名得到（与其同名，或在其后加序号），
+                         为 True 时内容相同的其他输入图片会将该结果复制为自己的文件名
         """
         image.save(f"{self.output_dir}/{filename}", format="PNG")
+        self._record(filename, by_input)
+
+    @staticmethod
+    def _record(filename: str, by_input: bool = True) -> None:
+        """记录输出至输出文件夹的文件名，用于去重和缓存处理结果"""
+        if getattr(_recorder, "outputs", None) is not None:
+            _recorder.outputs.append((filename, by_input))
 
     def clear(self) -> None:
         """
@@ -276,16 +740,454 @@ class PictureProcessor:
             os.rmdir(self.output_dir)
 
 
+def _optimize_in(directory: str, file: str) -> tuple[int, int]:
+    """优化 directory 下的单张图片，定义在模块级别以便传递给子进程"""
+    return PictureProcessor.optimize_png(f"{directory}/{file}")
+
+
+class RegionMask:
+    """
+    由多个矩形范围组成的颜色遮罩
+
+    遮罩按图片尺寸预先生成一次：用数组运算计算出每个像素被哪个范围覆盖（范围重叠时以后一个为准），
+    再按范围的颜色生成只覆盖所有范围外接矩形的遮罩图层。之后每张图片只需要将该矩形内的像素与图层混合，
+    结果与在整张图片上绘制遮罩后再 alpha_composite 完全相同。
+
+    Attributes:
+        boxes: 每个范围的 (左, 上, 右, 下) 像素坐标，包含右边和下边，与 ImageDraw.rectangle 一致
+        colors: 每个范围的 RGBA，(N, 4) 的数组
+    """
+
+    def __init__(self, boxes: list[tuple[int, int, int, int]], colors: np.ndarray) -> None:
+        self.boxes = boxes
+        self.colors = colors
+        # 图片尺寸 -> (外接矩形, 遮罩图层)，没有范围落在图片内时为 None
+        self._layers: dict[tuple[int, int], Optional[tuple[tuple[int, int, int, int], Image.Image]]] = {}
+
+    @classmethod
+    def parse(cls, region_lists: list[str | tuple[str, tuple]], color=None, tile_width: int = 16) -> RegionMask:
+        """
+        解析地块坐标形式的遮罩范围
+        :param region_lists: 遮罩的范围，格式为：["int,int;int,int", ...] 或 [("int,int;int,int", (r, g, b, a)), ...]
+        :param color: 未单独指定颜色的范围所使用的 RGBA
+        :param tile_width: 图块宽度
+        """
+        strings: list[str] = []
+        colors: list[tuple] = []
+        for region in region_lists:
+            region, region_color = (region, color) if isinstance(region, str) else region
+            if region_color is None:
+                raise ValueError(f"no color specified for region {region}!")
+            strings.append(region)
+            colors.append(tuple(region_color) + (255,) * (4 - len(region_color)))
+
+        regions = PictureProcessor._parse_regions(strings, tile_width)
+        boxes = [(p0.x, p0.y, p1.x, p1.y) for p0, p1 in regions]
+        return cls(boxes, np.array(colors, dtype=np.uint8).reshape(-1, 4))
+
+    def __repr__(self) -> str:
+        return f"RegionMask({self.boxes}, {self.colors.tolist()})"
+
+    def apply(self, image: Image) -> Image:
+        """
+        在图片之上绘制遮罩
+        :param image: 原图
+        :return: 绘制遮罩后的 RGBA 图片
+        """
+        image = image.convert("RGBA")
+        layer = self._get_layer(image.width, image.height)
+        if layer is None:
+            return image
+        bbox, mask_layer = layer
+        image.paste(Image.alpha_composite(image.crop(bbox), mask_layer), bbox[:2])
+        return image
+
+    def _get_layer(self, width: int, height: int) -> Optional[tuple[tuple[int, int, int, int], Image.Image]]:
+        """生成指定尺寸的图片所使用的遮罩图层，同一尺寸只生成一次"""
+        if (width, height) not in self._layers:
+            owner = np.full((height, width), -1, dtype=np.int32)
+            for i, (left, top, right, bottom) in enumerate(self.boxes):
+                # 起止坐标都限制在图片内，完全位于图片左方或上方的范围不会因负数下标绕到图片另一侧
+                owner[max(top, 0):max(bottom + 1, 0), max(left, 0):max(right + 1, 0)] = i
+            rows = np.flatnonzero((owner >= 0).any(axis=1))
+            cols = np.flatnonzero((owner >= 0).any(axis=0))
+            if len(rows) == 0:
+                self._layers[(width, height)] = None
+            else:
+                top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+                # 在颜色表前加一个透明色，未被覆盖的像素（-1）对应透明色
+                palette = np.vstack([np.zeros((1, 4), dtype=np.uint8), self.colors])
+                pixels = palette[owner[top:bottom, left:right] + 1]
+                self._layers[(width, height)] = ((int(left), int(top), int(right), int(bottom)),
+                                                 Image.fromarray(pixels, "RGBA"))
+        return self._layers[(width, height)]
+
+
+class ResultCache:
+    """
+    图片处理结果的缓存
+
+    以 (输入图片的哈希值, 操作名称及参数) 为键，每个键对应缓存目录下的一个子目录，其中保存了全部输出文件，
+    以及记录输出文件名的 manifest.json。由输入文件名得到的输出文件名只记录其后缀，因此内容相同、名称不同的图片也能命中缓存。
+
+    Attributes:
+        cache_dir: 缓存目录
+    """
+
+    # manifest.json 的格式版本，版本不同的缓存视为未命中
+    VERSION = 2
+
+    def __init__(self, cache_dir: Union[str, Path]) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def key(file_hash: str, operation: tuple) -> str:
+        """
+        计算缓存键
+        :param file_hash: 输入图片的哈希值
+        :param operation: 操作名称及参数
+        """
+        return FileUtils.get_data_hash([file_hash, operation])
+
+    def restore(self, key: str, stem: str, output_dir: str) -> Optional[list[tuple[str, bool]]]:
+        """
+        将缓存的结果复制到输出文件夹
+        :param key: 缓存键
+        :param stem: 输入图片不含扩展名的文件名
+        :param output_dir: 输出文件夹
+        :return: 输出的 (文件名, 是否由输入文件名得到)，未命中缓存时返回 None
+        """
+        manifest_path = self.cache_dir / key / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        manifest = FileUtils.read_json(manifest_path)
+        if manifest.get("version") != self.VERSION:
+            return None
+        outputs: list[tuple[str, bool]] = []
+        for entry in manifest["outputs"]:
+            name = stem + entry["suffix"] if entry["relative"] else entry["suffix"]
+            shutil.copyfile(self.cache_dir / key / entry["file"], f"{output_dir}/{name}")
+            outputs.append((name, entry["relative"]))
+        return outputs
+
+    def store(self, key: str, stem: str, output_dir: str, outputs: list[tuple[str, bool]]) -> None:
+        """
+        将输出文件复制到缓存中，manifest.json 最后写入，写入中断的缓存不会被读取
+        :param key: 缓存键
+        :param stem: 输入图片不含扩展名的文件名
+        :param output_dir: 输出文件夹
+        :param outputs: 输出的 (文件名, 是否由输入文件名得到)
+        """
+        entry_dir = self.cache_dir / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        entries: list[dict] = []
+        for i, (name, by_input) in enumerate(outputs):
+            file = f"{i}{os.path.splitext(name)[1]}"
+            shutil.copyfile(f"{output_dir}/{name}", entry_dir / file)
+            entries.append({"file": file, "suffix": name[len(stem):] if by_input else name, "relative": by_input})
+        FileUtils.write_json({"version": self.VERSION, "outputs": entries}, entry_dir / "manifest.json")
+
+    def clear(self) -> None:
+        """清除全部缓存"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+class GifPalette:
+    """
+    gif 中所有帧共用的调色板，0 号颜色为透明色
+
+    Attributes:
+        colors: 调色板中的颜色，(N, 3) 的数组，不含透明色，最多 255 种
+        exact: 调色板是否包含了全部帧的所有颜色，为 False 时会映射到最接近的颜色
+    """
+
+    def __init__(self, colors: np.ndarray, exact: bool) -> None:
+        self.colors = colors
+        self.exact = exact
+        self._keys = self._to_keys(colors)
+        self._palette_image: Optional[Image.Image] = None
+        if not exact:
+            self._palette_image = Image.new("P", (1, 1))
+            self._palette_image.putpalette(colors.astype(np.uint8).tobytes())
+
+    @classmethod
+    def from_frames(cls, frames) -> GifPalette:
+        """
+        统计所有帧中不透明像素的颜色，颜色超过 255 种时使用中位切分法缩减
+        :param frames: RGBA 数组的迭代器
+        """
+        keys = np.empty(0, dtype=np.uint32)
+        for frame in frames:
+            opaque = frame[frame[..., 3] >= GIF_ALPHA_THRESHOLD]
+            keys = np.union1d(keys, cls._to_keys(opaque[:, :3]))
+
+        colors = np.stack([(keys >> 16) & 0xFF, (keys >> 8) & 0xFF, keys & 0xFF], axis=1).astype(np.uint8)
+        if len(colors) <= 255:
+            return cls(colors, exact=True)
+
+        reduced = Image.fromarray(colors.reshape(1, -1, 3), "RGB").quantize(255, method=Image.Quantize.MEDIANCUT)
+        palette = np.array(reduced.getpalette()[:255 * 3], dtype=np.uint8).reshape(-1, 3)
+        return cls(palette, exact=False)
+
+    def index(self, frame: np.ndarray) -> np.ndarray:
+        """
+        将 RGBA 数组转换为调色板序号
+        :param frame: (高, 宽, 4) 的 RGBA 数组
+        :return: (高, 宽) 的调色板序号，透明像素为 0
+        """
+        if self.exact:
+            indices = np.searchsorted(self._keys, self._to_keys(frame[..., :3])) + 1
+        else:
+            quantized = Image.fromarray(np.ascontiguousarray(frame[..., :3]), "RGB").quantize(
+                palette=self._palette_image, dither=Image.Dither.NONE)
+            indices = np.asarray(quantized).astype(np.intp) + 1
+        indices[frame[..., 3] < GIF_ALPHA_THRESHOLD] = 0
+        return indices.astype(np.uint8)
+
+    @staticmethod
+    def _to_keys(rgb: np.ndarray) -> np.ndarray:
+        """将 RGB 颜色编码为整数"""
+        rgb = rgb.astype(np.uint32)
+        return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+class GifWriter:
+    """
+    逐帧写入 gif 文件，每一帧写入后即可释放
+
+    Attributes:
+        fp: 以二进制写入模式打开的文件
+        size: 画布尺寸 (宽, 高)
+    """
+
+    def __init__(self, fp, size: tuple[int, int], colors: np.ndarray, loop: int = 0) -> None:
+        """
+        写入文件头、全局调色板和循环次数
+        :param colors: 调色板中除透明色以外的颜色
+        :param loop: 循环次数，0 为无限循环
+        """
+        self.fp = fp
+        self.size = size
+        table = np.zeros((256, 3), dtype=np.uint8)
+        table[1:len(colors) + 1] = colors
+        # 文件头，0xF7 表示带有 256 色的全局调色板
+        fp.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0xF7, 0, 0))
+        fp.write(table.tobytes())
+        # NETSCAPE2.0 扩展，指定循环次数
+        fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    def write_frame(self, indices: np.ndarray, duration: int) -> None:
+        """
+        编码并写入一帧，0 号颜色为透明色，每帧显示后清除为背景
+        :param indices: (高, 宽) 的调色板序号
+        :param duration: 显示时间（毫秒）
+        """
+        frame = Image.fromarray(indices, "L")
+        for data in GifImagePlugin.getdata(frame, duration=duration, disposal=2, transparency=0):
+            self.fp.write(data)
+
+    def close(self) -> None:
+        """写入文件结尾"""
+        self.fp.write(b";")
+
+
+class PngWriter:
+    """
+    逐块写入 png 文件，每一块写入后即可释放，用于输出无法一次性放入内存的大图
+
+    每一行都使用 Up 滤波（与上一行逐字节相减），放大后重复的行会变为全 0，压缩效果较好
+
+    Attributes:
+        fp: 以二进制写入模式打开的文件
+        size: 图片尺寸 (宽, 高)
+        rows: 已写入的行数
+    """
+
+    # 图片模式对应的 png 颜色类型
+    COLOR_TYPES = {"L": 0, "RGB": 2, "P": 3, "LA": 4, "RGBA": 6}
+
+    def __init__(self, fp, size: tuple[int, int], mode: str, palette: Optional[bytes] = None,
+                 transparency: Optional[bytes] = None, compress_level: int = 6) -> None:
+        """
+        写入文件头和调色板
+        :param mode: 图片模式，见 COLOR_TYPES
+        :param palette: 调色板图片的 RGB 调色板
+        :param transparency: 调色板图片每种颜色的透明度
+        :param compress_level: zlib 压缩等级
+        """
+        self.fp = fp
+        self.size = size
+        self.rows = 0
+        fp.write(b"\x89PNG\r\n\x1a\n")
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", size[0], size[1], 8, self.COLOR_TYPES[mode], 0, 0, 0))
+        if palette:
+            self._write_chunk(b"PLTE", palette)
+        if transparency:
+            self._write_chunk(b"tRNS", transparency)
+        self._compressor = zlib.compressobj(compress_level)
+        # 第一行之前视为全 0 的行
+        self._previous: Optional[np.ndarray] = None
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """
+        压缩并写入若干行
+        :param rows: (行数, 宽, 通道数) 的像素
+        """
+        rows = rows.reshape(rows.shape[0], -1)
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        # 滤波类型 2 为 Up
+        filtered[:, 0] = 2
+        filtered[0, 1:] = rows[0] if self._previous is None else rows[0] - self._previous
+        np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+        self._previous = rows[-1].copy()
+        self.rows += rows.shape[0]
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        """写入剩余的压缩数据和文件结尾"""
+        if self.rows != self.size[1]:
+            raise ValueError(f"expected {self.size[1]} rows, got {self.rows}!")
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        self.fp.write(struct.pack(">I", len(data)) + chunk_type + data)
+        self.fp.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+class Pipeline:
+    """
+    图片处理流水线
+
+    依次记录裁剪、分割、缩放、遮罩和筛选操作，调用 run 时才逐张执行。
+    每张图片只读取和解码一次，所有操作都在内存中完成，每个结果只编码保存一次，不会产生中间文件。
+
+    Attributes:
+        processor: 所属的 PictureProcessor，决定输入图片、输出目录和并行方式
+        operations: 已记录的操作，每一项为 (操作名, 参数)
+    """
+
+    def __init__(self, processor: PictureProcessor) -> None:
+        self.processor = processor
+        self.operations: list[tuple[str, dict]] = []
+
+    def crop(self, cutRange: tuple[int, int, int, int]) -> Pipeline:
+        """
+        裁剪出指定范围内的像素，同 divide_pic
+        :param cutRange: 裁剪范围，格式为：[左上角 x, 左上角 y, 右下角 x, 右下角 y]
+        """
+        self.operations.append(("crop", {"cutRange": cutRange}))
+        return self
+
+    def divide(self, region_height: Optional[int] = None, region_width: Optional[int] = None) -> Pipeline:
+        """
+        按指定高度和宽度将图片分割为多个区域，文件名加序号，同 divide_by_width、divide_by_height 和 divide_by_region
+        :param region_height: 每个区域的高度（像素），留空则不按高度分割
+        :param region_width: 每个区域的宽度（像素），留空则不按宽度分割
+        """
+        self.operations.append(("divide", {"region_height": region_height, "region_width": region_width}))
+        return self
+
+    def resize(self, scale: float = 3.0) -> Pipeline:
+        """
+        使用硬边缘缩放图片尺寸，同 resize_pic
+        :param scale: 缩放比例
+        """
+        self.operations.append(("resize", {"scale": scale}))
+        return self
+
+    def mask(self, region_lists: list[str | tuple[str, tuple]], color=None, tile_width: int = 16) -> Pipeline:
+        """
+        在图片之上绘制遮罩，同 add_mask
+        :param region_lists: 遮罩的范围，格式为：["int,int;int,int", ...] 或 [("int,int;int,int", (r, g, b, a)), ...]
+        :param color: 未单独指定颜色的范围所使用的 RGBA
+        :param tile_width: 图块宽度，默认为 16
+        """
+        self.operations.append(("mask", {"mask": RegionMask.parse(region_lists, color, tile_width)}))
+        return self
+
+    def select(self, ends_with: str) -> Pipeline:
+        """
+        只保留名称后缀为特定值的图片，并去掉该后缀，同 select
+        :param ends_with: 需要筛选的后缀
+        """
+        self.operations.append(("select", {"ends_with": ends_with}))
+        return self
+
+    def run(self, cover=False) -> None:
+        """
+        对 pics 文件夹内的所有图片执行流水线
+        :param cover: 是否覆盖原图片，若为 True 则会直接在原目录中操作，否则输出至 output文件夹
+        """
+        self.processor._run_outputs(partial(self._run_one, cover=cover), ("pipeline", self.operations), cover)
+        if cover:
+            self.processor._update()
+
+    def _run_one(self, pic: str, cover: bool) -> None:
+        name, ext = os.path.splitext(pic)
+        with Image.open(f"pics/{pic}") as image:
+            image.load()
+            images: list[tuple[str, Image]] = [(name, image)]
+            for operation, kwargs in self.operations:
+                images = getattr(self, f"_{operation}")(images, **kwargs)
+
+        for result_name, result in images:
+            filename = f"{result_name}{ext}"
+            if cover:
+                result.save(f"pics/{filename}")
+            else:
+                self.processor._save(result, filename)
+        if cover and all(f"{result_name}{ext}" != pic for result_name, _ in images):
+            os.remove(f"pics/{pic}")
+
+    @staticmethod
+    def _crop(images: list[tuple[str, Image]], cutRange: tuple[int, int, int, int]) -> list[tuple[str, Image]]:
+        return [(name, image.crop(cutRange)) for name, image in images]
+
+    @staticmethod
+    def _divide(images: list[tuple[str, Image]], region_height: Optional[int],
+                region_width: Optional[int]) -> list[tuple[str, Image]]:
+        results: list[tuple[str, Image]] = []
+        for name, image in images:
+            img_width, img_height = image.size
+            count = 1
+            for top in range(0, img_height, region_height or img_height):
+                bottom = min(top + (region_height or img_height), img_height)
+                for left in range(0, img_width, region_width or img_width):
+                    right = min(left + (region_width or img_width), img_width)
+                    results.append((f"{name} {count}", image.crop((left, top, right, bottom))))
+                    count += 1
+        return results
+
+    @staticmethod
+    def _resize(images: list[tuple[str, Image]], scale: float) -> list[tuple[str, Image]]:
+        return [(name, image.resize((int(image.size[0] * scale), int(image.size[1] * scale)), Resampling.NEAREST))
+                for name, image in images]
+
+    @staticmethod
+    def _mask(images: list[tuple[str, Image]], mask: RegionMask) -> list[tuple[str, Image]]:
+        return [(name, mask.apply(image)) for name, image in images]
+
+    @staticmethod
+    def _select(images: list[tuple[str, Image]], ends_with: str) -> list[tuple[str, Image]]:
+        return [(name[:len(name) - len(ends_with)], image) for name, image in images if name.endswith(ends_with)]
+
+
 if __name__ == "__main__":
     # 默认运行完成后不清除原始文件，如需调整，改为 True
-    processor = PictureProcessor(clearInputDir=False)
+    # 图片较多时可以增大 workers 并行处理，反复处理相同的图片时可以设置 use_cache=True 复用之前的结果
+    processor = PictureProcessor(clearInputDir=False, workers=1, use_cache=False)
     try:
         # 按需调用
         processor.resize_pic()
         ...
+        # 上传至 Wiki 前可以无损压缩输出的图片
+        # processor.optimize_outputs()
     except Exception as error:
         print(error)
         raise
     finally:
-        if 'error' not in locals():
+        if 'error' not in locals() and not processor.errors:
             processor.clear()
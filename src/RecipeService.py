@@ -33,8 +33,8 @@ class RecipeData:
         }
 
         json_path = Path(__file__).parent.parent / "json"
-        self.crafting_recipes = FileUtils.read_json(json_path / "CraftingRecipes.json")
-        self.cooking_recipes = FileUtils.read_json(json_path / "CookingRecipes.json")
+        self.crafting_recipes = json_cache.read(json_path / "CraftingRecipes.json")
+        self.cooking_recipes = json_cache.read(json_path / "CookingRecipes.json")
         self._parse_all_recipes()
 
     def _parse_all_recipes(self):
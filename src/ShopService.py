@@ -1,5 +1,10 @@
+import copy
+
 from src.ItemService import *
 
+# 表示 Goods.item 尚未查找的标记，与查找失败得到的 None 区分
+_UNRESOLVED = object()
+
 
 class Goods:
     """
@@ -19,23 +24,51 @@ class Goods:
         item: 物品对应的 Item 实例
     """
 
-    def __init__(self, goods: dict, random_sell: bool = False) -> None:
+    __slots__ = ("_data", "raw", "id", "item_id", "price", "random_sell", "_item")
+
+    def __init__(self, goods: dict, random_sell: bool = False, data: GameData | None = None) -> None:
+        self._data: GameData = game_data if data is None else data
         self.raw: dict = goods
         self.id: str = goods.get("Id")
         self.item_id: str | None = goods.get("ItemId")
         self.price: int = goods.get("Price")
-        self.trade_item_id: str | None = goods.get("TradeItemId")
-        self.trade_item_amount: int = goods.get("TradeItemAmount")
-        self.min_stack: int = goods.get("MinStack")
-        self.available_stock: int = goods.get("AvailableStock")
         self.random_sell: bool = random_sell
-        self.is_recipe: bool = goods.get("IsRecipe")
-        self.ignore_pm: bool = goods.get("IgnoreShopPriceModifiers")
-        self.item: Object | None = game_data.try_get_object(self.item_id)
+        self._item: Object | None = _UNRESOLVED
+
+    @property
+    def item(self) -> Object | None:
+        """原始数据中 ItemId 对应的 Item 实例，首次读取时才进行查找"""
+        if self._item is _UNRESOLVED:
+            self._item = self._data.try_get_object(self.raw.get("ItemId"))
+        return self._item
+
+    @property
+    def trade_item_id(self) -> str | None:
+        return self.raw.get("TradeItemId")
+
+    @property
+    def trade_item_amount(self) -> int:
+        return self.raw.get("TradeItemAmount")
+
+    @property
+    def min_stack(self) -> int:
+        return self.raw.get("MinStack")
+
+    @property
+    def available_stock(self) -> int:
+        return self.raw.get("AvailableStock")
+
+    @property
+    def is_recipe(self) -> bool:
+        return self.raw.get("IsRecipe")
+
+    @property
+    def ignore_pm(self) -> bool:
+        return self.raw.get("IgnoreShopPriceModifiers")
 
     def to_dict(self):
         try:
-            return {"Name": game_data.get_name(self.item_id), "DisplayName": game_data.get_display_name(self.item_id),
+            return {"Name": self._data.get_name(self.item_id), "DisplayName": self._data.get_display_name(self.item_id),
                     "ID": self.item_id, "Price": self.price, "AvailableStock": self.available_stock,
                     "TradeItemId": self.trade_item_id, "TradeItemAmount": self.trade_item_amount,
                     "IsRecipe": self.is_recipe, "IgnorePM": self.ignore_pm, "IsRandomSell": self.random_sell}
@@ -92,10 +125,12 @@ class PriceModifier:
 
 
 class ShopData:
-    def __init__(self, shop: dict, is_traveler=False) -> None:
+    def __init__(self, shop: dict, is_traveler=False, data: GameData | None = None) -> None:
+        data = game_data if data is None else data
         self.raw: dict = shop
         self.price_modifiers: PriceModifier | None = None
         self.goods: list[Goods] = []
+        self._goods_index: dict[str, list[Goods]] = {}  # 物品 ID -> 商品列表，同时包含带前缀和去除前缀的 ID
 
         if shop is None:
             return
@@ -110,45 +145,61 @@ class ShopData:
                 # 处理随机出售某些物品的情况
                 if g.get("ItemId") is None and g.get("RandomItemId") is not None:
                     for item_id in g.get("RandomItemId"):
-                        cache = Goods(g, random_sell=True)
+                        cache = Goods(g, random_sell=True, data=data)
                         cache.item_id = item_id
                         self.goods.append(cache)
                 # 处理固定出售物品的情况
                 elif g.get("ItemId") is not None:
-                    self.goods.append(Goods(g))
+                    self.goods.append(Goods(g, data=data))
                 # ？？？
                 else:
                     raise ValueError("unexpected item!")
         # 若当前商店是旅行商店
         else:
-            # 获取猪车全部可能出售的物品
-            for random_id in range(2, 790):
-                item = game_data.try_get_object(str(random_id))
-                # 看是否被排除
-                if item is None or item.category == -999 or item.get_field("ExcludeFromRandomSale") is True:
-                    continue
-                g = Goods(shop.get("Items")[0])
-                g.price = item.sellprice
+            # 获取猪车全部可能出售的物品，所有商品共用同一个模板
+            template = Goods(shop.get("Items")[0], data=data)
+            candidates = data.get_random_sale_objects()
+            for random_id, price in zip(candidates.index, candidates["price"].tolist()):
+                g = copy.copy(template)
+                g.price = price
                 g.id = f"RandomSale (O){random_id}"
-                g.item_id = Object.qualify(str(random_id))
+                g.item_id = Object.qualify(random_id)
                 self.goods.append(g)
 
         self._apply_price_modifiers()
+        self._build_goods_index()
+
+    def _build_goods_index(self) -> None:
+        """
+        建立物品 ID 到商品的索引，随机出售的物品和猪车的商品均已展开为单独的商品
+        """
+        self._goods_index.clear()
+        for g in self.goods:
+            if type(g.item_id) is not str:
+                continue
+            self._goods_index.setdefault(g.item_id, []).append(g)
+            trimmed_id = Object.trim(g.item_id)
+            if trimmed_id != g.item_id:
+                self._goods_index.setdefault(trimmed_id, []).append(g)
+
+    def get_all_goods(self, code: str) -> list[Goods]:
+        """
+        获取商店中出售指定物品的全部商品
+        :param code: 物品的 QualifiedItemID 或 Id
+        :return: 商品列表，按商店数据中的顺序排列
+        """
+        return self._goods_index.get(code, [])
 
     def try_get_goods(self, code: str) -> Goods | None:
         """
         根据物品的 QualifiedItemID 来创建 Goods 实例。
-        :param code: 物品的 QualifiedItemID
+        :param code: 物品的 QualifiedItemID 或 Id
         :return: 商品实例
         """
-        try:
-            for g in self.goods:
-                trimmed_id = Object.trim(g.item_id)
-                if trimmed_id == code:
-                    return g
-            return None
-        except (KeyError, TypeError):
+        goods = self._goods_index.get(code)
+        if goods is None:
             return None
+        return goods[0]
 
     def _apply_price_modifiers(self) -> None:
         """
@@ -168,18 +219,84 @@ class ShopData:
                 g.price = self.price_modifiers.apply(g)
 
 
+# ShopManager 属性 -> (Shops.json 中的商店名, 是否为旅行商店)
+_SHOPS: dict[str, tuple[str, bool]] = {
+    "seed_shop": ("SeedShop", False),
+    "joja_mart": ("Joja", False),
+    "oasis": ("Sandy", False),
+    "traveler": ("Traveler", True),
+    "island_trade": ("IslandTrade", False),
+    "raccoon_shop": ("Raccoon", False),
+    "nmday1": ("Festival_NightMarket_MagicBoat_Day1", False),
+    "nmday2": ("Festival_NightMarket_MagicBoat_Day2", False),
+    "nmday3": ("Festival_NightMarket_MagicBoat_Day3", False),
+    "adventure_guild": ("AdventureShop", False),
+}
+
+
 class ShopManager:
-    def __init__(self) -> None:
-        self.seed_shop = ShopData(game_data.shops_data.get("SeedShop"))
-        self.joja_mart = ShopData(game_data.shops_data.get("Joja"))
-        self.oasis = ShopData(game_data.shops_data.get("Sandy"))
-        self.traveler = ShopData(game_data.shops_data.get("Traveler"), is_traveler=True)
-        self.island_trade = ShopData(game_data.shops_data.get("IslandTrade"))
-        self.raccoon_shop = ShopData(game_data.shops_data.get("Raccoon"))
-        self.nmday1 = ShopData(game_data.shops_data.get("Festival_NightMarket_MagicBoat_Day1"))
-        self.nmday2 = ShopData(game_data.shops_data.get("Festival_NightMarket_MagicBoat_Day2"))
-        self.nmday3 = ShopData(game_data.shops_data.get("Festival_NightMarket_MagicBoat_Day3"))
-        self.adventure_guild = ShopData(game_data.shops_data.get("AdventureShop"))
+    """
+    管理常用商店的类，各商店均在首次访问时才进行解析，之后缓存在实例中
+
+    Attributes:
+        data: 商店数据来源的 GameData 实例
+        version: 创建时 GameData 的数据版本号
+    """
+
+    seed_shop: ShopData
+    joja_mart: ShopData
+    oasis: ShopData
+    traveler: ShopData
+    island_trade: ShopData
+    raccoon_shop: ShopData
+    nmday1: ShopData
+    nmday2: ShopData
+    nmday3: ShopData
+    adventure_guild: ShopData
+
+    def __init__(self, data: GameData | None = None) -> None:
+        self.data: GameData = game_data if data is None else data
+        self.version: int = self.data.version
+
+    def __getattr__(self, attr: str) -> ShopData:
+        """
+        仅在实例中不存在该属性时调用，用于按需解析商店
+        :param attr: 需要获取的商店属性名
+        :return: 解析得到的商店实例
+        :exception AttributeError: 不存在该商店
+        """
+        if attr not in _SHOPS:
+            raise AttributeError(f"'ShopManager' object has no attribute '{attr}'")
+
+        shop_name, is_traveler = _SHOPS[attr]
+        shop = ShopData(self.data.shops_data.get(shop_name), is_traveler=is_traveler, data=self.data)
+        setattr(self, attr, shop)
+        return shop
+
+    def preload(self) -> None:
+        """
+        立即解析全部商店
+        """
+        for attr in _SHOPS:
+            getattr(self, attr)
+
+
+# 命名空间 -> 共享的 ShopManager 实例
+_shop_managers: dict[str, ShopManager] = {}
+
+
+def get_shop_manager(data: GameData | None = None) -> ShopManager:
+    """
+    获取指定 GameData 对应的共享 ShopManager，GameData 重新读取数据后会自动重建
+    :param data: 商店数据来源的 GameData 实例，留空则使用全局的 game_data
+    :return: ShopManager 实例
+    """
+    data = game_data if data is None else data
+    manager = _shop_managers.get(data.namespace)
+    if manager is None or manager.data is not data or manager.version != data.version:
+        manager = ShopManager(data)
+        _shop_managers[data.namespace] = manager
+    return manager
 
 
 if __name__ == "__main__":
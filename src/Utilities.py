@@ -7,6 +7,7 @@ import datetime
 import hashlib
 import json
 import os
+import pickle
 import time
 from functools import wraps
 from pathlib import Path
@@ -179,6 +180,88 @@ class FileUtils:
                 hash_func.update(chunk)
         return hash_func.hexdigest()
 
+    @staticmethod
+    def get_data_hash(data: Any, algorithm: str = "md5") -> str:
+        """计算可 JSON 序列化的数据的哈希值，字典的键顺序不影响结果"""
+        hash_func = getattr(hashlib, algorithm)()
+        hash_func.update(json.dumps(data, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        return hash_func.hexdigest()
+
+
+class JsonCache:
+    """
+    JSON 解析结果的二进制缓存
+
+    每个 JSON 文件的解析结果以 pickle 格式保存在缓存目录下，文件头记录源文件的修改时间、大小和哈希值，
+    源文件未变化时直接读取缓存，跳过 JSON 解码。
+
+    使用方式:
+    cache = JsonCache(Path(".cache")); data = cache.read("json/Objects.json")
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存文件存放的目录
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def _cache_file(self, filepath: Path) -> Path:
+        """获取源文件对应的缓存文件路径，以源文件的绝对路径区分同名文件"""
+        key = hashlib.md5(str(filepath.resolve()).encode("utf-8")).hexdigest()[:8]
+        return self.cache_dir / f"{filepath.stem}.{key}.pickle"
+
+    def read(self, filepath: Union[str, Path]) -> dict:
+        """读取 JSON 文件，源文件未变化时使用缓存"""
+        filepath = Path(filepath)
+        try:
+            stat = filepath.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"找不到文件: {filepath}")
+
+        cache_file = self._cache_file(filepath)
+        try:
+            with cache_file.open("rb") as f:
+                mtime, size, file_hash = pickle.load(f)
+                # 修改时间和大小一致，认为源文件未变化
+                if mtime == stat.st_mtime_ns and size == stat.st_size:
+                    return pickle.load(f)
+                # 修改时间变化但内容一致（例如重新解包），读取缓存并更新文件头
+                if size == stat.st_size and file_hash == FileUtils.get_file_hash(filepath):
+                    data = pickle.load(f)
+                    self._dump(data, filepath, stat, file_hash)
+                    return data
+        except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
+            pass
+
+        data = FileUtils.read_json(filepath)
+        self._dump(data, filepath, stat)
+        return data
+
+    def _dump(self, data: dict, filepath: Path, stat: os.stat_result, file_hash: Optional[str] = None) -> None:
+        """将解析结果写入缓存文件，先写入临时文件再替换，避免留下不完整的缓存"""
+        if file_hash is None:
+            file_hash = FileUtils.get_file_hash(filepath)
+        cache_file = self._cache_file(filepath)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with temp_file.open("wb") as f:
+            pickle.dump((stat.st_mtime_ns, stat.st_size, file_hash), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+
+    def clear(self) -> int:
+        """删除全部缓存文件，返回删除的文件数量"""
+        if not self.cache_dir.is_dir():
+            return 0
+        count = 0
+        for cache_file in self.cache_dir.glob("*.pickle"):
+            cache_file.unlink()
+            count += 1
+        return count
+
 
 class StringUtils:
     """字符串处理工具类"""
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import src.Infobox_generator.__main__ as generator_main
+from src.Infobox_generator import Infobox_incremental
+from src.Infobox_generator.Infobox_incremental import Fingerprints, load_state, save_state
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    """将指纹目录和共用源文件替换为临时文件，返回 (生成器源文件, 共用源文件)"""
+    generator = tmp_path / "generator.py"
+    shared = tmp_path / "shared.py"
+    generator.write_text("# generator\n", encoding="utf-8")
+    shared.write_text("# shared\n", encoding="utf-8")
+    monkeypatch.setattr(Infobox_incremental, "STATE_DIR", tmp_path / "state")
+    monkeypatch.setattr(Infobox_incremental, "SHARED_FILES", [shared])
+    return generator, shared
+
+
+def generate(generator, inputs: dict[str, str]) -> Fingerprints:
+    """模拟一次增量生成并保存指纹"""
+    fingerprints = load_state("test", generator, inputs.get)
+    for item_id in inputs:
+        fingerprints(item_id)
+    save_state("test", generator, fingerprints)
+    return fingerprints
+
+
+def test_manifest_reports_added_changed_and_removed(state):
+    generator, _ = state
+    first = generate(generator, {"1": "a", "2": "b", "3": "c"})
+    assert first.manifest() == {"added": ["1", "2", "3"], "changed": [], "removed": []}
+
+    fingerprints = load_state("test", generator, {"1": "a", "2": "B", "4": "d"}.get)
+    assert [item_id for item_id in ["1", "2", "4"] if fingerprints(item_id)] == ["2", "4"]
+    assert fingerprints.manifest() == {"added": ["4"], "changed": ["2"], "removed": ["3"]}
+
+
+def test_unchanged_inputs_need_no_regeneration(state):
+    generator, _ = state
+    generate(generator, {"1": "a", "2": "b"})
+    second = generate(generator, {"1": "a", "2": "b"})
+    assert not second.generator_changed
+    assert second.manifest() == {"added": [], "changed": [], "removed": []}
+
+
+@pytest.mark.parametrize("changed_file", [0, 1], ids=["generator", "shared"])
+def test_code_change_regenerates_every_item(state, changed_file):
+    generator, _ = state
+    generate(generator, {"1": "a", "2": "b"})
+    state[changed_file].write_text("# edited\n", encoding="utf-8")
+
+    fingerprints = load_state("test", generator, {"1": "a", "2": "b"}.get)
+    assert fingerprints.generator_changed
+    assert fingerprints("1") and fingerprints("2")
+    assert fingerprints.manifest()["changed"] == ["1", "2"]
+
+
+def test_run_does_not_save_state(state, monkeypatch):
+    generator, _ = state
+    inputs = {"1": "a", "2": "b", "3": "c"}
+
+    def iter_infobox(item_filter):
+        for item_id in inputs:
+            if item_filter(item_id):
+                yield item_id, f"Page {item_id}", inputs[item_id]
+
+    module = SimpleNamespace(__file__=str(generator), get_inputs=inputs.get)
+    monkeypatch.setattr(generator_main, "FAMILIES", {"test": (module, iter_infobox)})
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results, family_fingerprints = generator_main.run(["test"], executor, incremental=True, chunks=2)
+
+    assert [record[0] for record in results["test"]] == ["1", "2", "3"]
+    assert list(family_fingerprints["test"].current) == ["1", "2", "3"]
+    # 指纹只有在页面写出之后才由调用方保存
+    assert not (Infobox_incremental.STATE_DIR / "test.json").exists()
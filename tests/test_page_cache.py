@@ -0,0 +1,122 @@
+import pytest
+
+from src.MediaWikiBot.LocalSite import LocalSite
+from src.MediaWikiBot.PageCache import PageCache
+
+
+@pytest.fixture
+def site():
+    site = LocalSite()
+    for i in range(120):
+        site.save_page(f"Page {i}", f"text {i}")
+    return site
+
+
+def queried_titles(site: LocalSite, prop: str) -> list[list[str]]:
+    """每次指定 prop 的查询所包含的标题"""
+    return [query["titles"].split("|") for query in site.queries if query["prop"] == prop]
+
+
+def test_fetch_batches_at_most_50_titles(site):
+    titles = [f"Page {i}" for i in range(120)]
+    cache = PageCache(site)
+
+    texts = cache.fetch(titles)
+
+    assert texts == {f"Page {i}": f"text {i}" for i in range(120)}
+    assert [len(batch) for batch in queried_titles(site, "info")] == [50, 50, 20]
+    assert [len(batch) for batch in queried_titles(site, "revisions")] == [50, 50, 20]
+    assert cache.requests == site.requests == 6
+
+
+def test_fetch_only_downloads_pages_with_new_revisions(site):
+    titles = [f"Page {i}" for i in range(120)]
+    cache = PageCache(site)
+    cache.fetch(titles)
+    site.queries.clear()
+
+    assert cache.fetch(titles)["Page 7"] == "text 7"
+    assert len(queried_titles(site, "info")) == 3
+    assert queried_titles(site, "revisions") == []
+
+    site.save_page("Page 7", "changed")
+    site.queries.clear()
+    assert cache.fetch(titles)["Page 7"] == "changed"
+    assert queried_titles(site, "revisions") == [["Page 7"]]
+
+
+def test_update_after_edit_avoids_download(site):
+    cache = PageCache(site)
+    cache.fetch(["Page 1"])
+    result = site.pages["Page 1"].edit("edited")
+    cache.update("Page 1", result["newrevid"], "edited")
+    site.queries.clear()
+
+    assert cache.fetch(["Page 1"]) == {"Page 1": "edited"}
+    assert queried_titles(site, "revisions") == []
+
+
+def test_missing_pages(site):
+    cache = PageCache(site)
+
+    assert cache.fetch(["Page 1", "No such page"]) == {"Page 1": "text 1", "No such page": ""}
+    assert queried_titles(site, "revisions") == [["Page 1"]]
+    assert cache.pages["No such page"] == {"revid": 0, "text": ""}
+
+    site.save_page("No such page", "created")
+    assert cache.fetch(["No such page"]) == {"No such page": "created"}
+
+
+def test_normalized_titles_map_back_to_requested_titles(site):
+    site.save_page("Foo bar", "foo")
+    cache = PageCache(site)
+
+    assert cache.fetch(["foo_bar", "page 3"]) == {"foo_bar": "foo", "page 3": "text 3"}
+    assert cache.get("foo_bar") == "foo"
+
+
+def test_save_and_reload(site, tmp_path):
+    filepath = tmp_path / "pages.json"
+    cache = PageCache(site, filepath)
+    cache.fetch(["Page 1", "Page 2"])
+    cache.save()
+
+    reloaded = PageCache(site, filepath)
+    site.queries.clear()
+    assert reloaded.fetch(["Page 1", "Page 2"]) == {"Page 1": "text 1", "Page 2": "text 2"}
+    assert queried_titles(site, "revisions") == []
+
+
+def test_fetch_follows_continue():
+    site = LocalSite(revisions_limit=7)
+    for i in range(30):
+        site.save_page(f"Page {i}", f"text {i}")
+    cache = PageCache(site)
+
+    texts = cache.fetch([f"Page {i}" for i in range(30)] + ["No such page"])
+
+    assert texts == {**{f"Page {i}": f"text {i}" for i in range(30)}, "No such page": ""}
+    # 30 个页面每次返回 7 个页面的文本，需要 5 次请求
+    assert len(queried_titles(site, "revisions")) == 5
+    assert all(page["revid"] != 0 for title, page in cache.pages.items() if title != "No such page")
+
+
+class TruncatedSite(LocalSite):
+    """prop=revisions 时不返回任何页面文本的 LocalSite，模拟异常的 API 返回值"""
+
+    def api(self, action: str, **kwargs) -> dict:
+        response = super().api(action, **kwargs)
+        if kwargs["prop"] == "revisions":
+            for page in response["query"]["pages"].values():
+                page.pop("revisions", None)
+        return response
+
+
+def test_fetch_never_blanks_existing_pages():
+    site = TruncatedSite()
+    site.save_page("Page 1", "text 1")
+    cache = PageCache(site)
+
+    with pytest.raises(RuntimeError):
+        cache.fetch(["Page 1"])
+    assert "Page 1" not in cache.pages
@@ -0,0 +1,212 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from src.Picture_processor.Picture_processor import PictureProcessor, RegionMask
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """在临时目录下创建 pics 文件夹，并切换工作目录"""
+    (tmp_path / "pics").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def random_image(seed: int, size: tuple[int, int] = (64, 48)) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (size[1], size[0], 4), dtype=np.uint8), "RGBA")
+
+
+def draw_mask(image: Image.Image, region_lists: list[str], color: tuple) -> Image.Image:
+    """使用 ImageDraw 在整张图层上绘制遮罩，作为 RegionMask 的参照"""
+    layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for p0, p1 in PictureProcessor._parse_regions(region_lists, 16):
+        draw.rectangle((p0.x, p0.y, p1.x, p1.y), fill=color)
+    return Image.alpha_composite(image.convert("RGBA"), layer)
+
+
+@pytest.mark.parametrize("regions", [
+    ["0,0;1,1"],
+    ["0,0;2,1", "1,1;3,2", "9,9;9,9"],
+    ["-3,0;-2,1"],
+    ["0,-3;1,-2"],
+    ["-1,-1;0,0", "3,-2;3,1"],
+])
+def test_region_mask_matches_image_draw(regions):
+    image = random_image(0)
+    color = (255, 0, 0, 100)
+    expected = np.asarray(draw_mask(image, regions, color))
+    assert np.array_equal(np.asarray(RegionMask.parse(regions, color).apply(image)), expected)
+
+
+def test_region_mask_off_image_region_leaves_image_unchanged():
+    image = random_image(1)
+    masked = RegionMask.parse(["-3,0;-2,1"], (255, 0, 0, 100)).apply(image)
+    assert np.array_equal(np.asarray(masked), np.asarray(image))
+
+
+def test_add_mask_with_off_image_region(workdir):
+    image = random_image(2)
+    image.save("pics/a.png")
+    processor = PictureProcessor()
+    processor.add_mask(["-3,0;-2,1", ("1,1;1,1", (0, 0, 255, 128))], (255, 0, 0, 100))
+    output = Image.open(f"{processor.output_dir}/a.png")
+    expected = draw_mask(image, ["1,1;1,1"], (0, 0, 255, 128))
+    assert np.array_equal(np.asarray(output), np.asarray(expected))
+    assert processor.errors == {}
+
+
+def write_png16(filepath, pixels: np.ndarray) -> None:
+    """写入 16 位的 RGB png，Pillow 无法直接保存这种图片"""
+    height, width, _ = pixels.shape
+    rows = b"".join(b"\x00" + row.astype(">u2").tobytes() for row in pixels)
+
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+    with open(filepath, "wb") as fp:
+        fp.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 16, 2, 0, 0, 0))
+                 + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def test_optimize_png_is_lossless(tmp_path):
+    rng = np.random.default_rng(3)
+    palette = rng.integers(0, 256, (8, 4), dtype=np.uint8)
+    pixels = palette[rng.integers(0, 8, (40, 40))]
+    filepath = tmp_path / "a.png"
+    Image.fromarray(pixels, "RGBA").save(filepath, compress_level=0)
+
+    before, after = PictureProcessor.optimize_png(str(filepath))
+
+    assert after < before
+    assert np.array_equal(np.asarray(Image.open(filepath).convert("RGBA")), pixels)
+
+
+def test_optimize_png_keeps_16_bit_grayscale(tmp_path):
+    filepath = tmp_path / "gray16.png"
+    pixels = np.arange(64 * 64, dtype=np.uint16).reshape(64, 64) * 13
+    Image.fromarray(pixels).save(filepath, compress_level=0)
+    data = filepath.read_bytes()
+
+    assert PictureProcessor.optimize_png(str(filepath)) == (len(data), len(data))
+    assert filepath.read_bytes() == data
+
+
+def test_optimize_png_keeps_16_bit_rgb(tmp_path):
+    filepath = tmp_path / "rgb16.png"
+    write_png16(filepath, np.random.default_rng(4).integers(0, 65536, (16, 16, 3), dtype=np.uint16))
+    data = filepath.read_bytes()
+    # Pillow 以 8 位的 RGB 模式读取这张图片，只检查模式无法发现精度损失
+    assert Image.open(filepath).mode == "RGB"
+
+    assert PictureProcessor.optimize_png(str(filepath)) == (len(data), len(data))
+    assert filepath.read_bytes() == data
+
+
+def source_image(mode: str) -> Image.Image:
+    image = random_image(7, (23, 17))
+    if mode == "P":
+        image = image.convert("RGB").quantize(16)
+        image.info["transparency"] = 3
+        return image
+    if mode == "I;16":
+        return Image.fromarray(np.random.default_rng(7).integers(0, 65536, (17, 23), dtype=np.uint16))
+    return image.convert(mode)
+
+
+@pytest.mark.parametrize("mode", ["L", "LA", "RGB", "RGBA", "P", "I;16"])
+@pytest.mark.parametrize("scale", [3, 2.5, 0.5])
+def test_resize_strips_match_image_resize(workdir, mode, scale):
+    source_image(mode).save("pics/a.png")
+    with Image.open("pics/a.png") as image:
+        expected = image.resize((int(image.width * scale), int(image.height * scale)), Image.Resampling.NEAREST)
+
+    processor = PictureProcessor()
+    processor.resize_pic(scale, strip_height=5)
+
+    with Image.open(f"{processor.output_dir}/a.png") as output:
+        assert output.mode == expected.mode
+        assert output.size == expected.size
+        assert np.array_equal(np.asarray(output), np.asarray(expected))
+        if mode == "P":
+            assert output.getpalette() == expected.getpalette()
+            assert output.info.get("transparency") == expected.info.get("transparency")
+    assert processor.errors == {}
+
+
+@pytest.fixture
+def sheet(workdir, monkeypatch):
+    """1.png 和 12.png 为内容相同的 32x32 精灵图，左下角的图块为空，前两个图块对应物品 128 和 129，物品 ID 以两张图片的文件名开头"""
+    import src.ItemService
+
+    pixels = np.asarray(random_image(5, (32, 32))).copy()
+    pixels[16:, :16] = 0
+    Image.fromarray(pixels).save("pics/1.png")
+    Image.fromarray(pixels).save("pics/12.png")
+    monkeypatch.setattr(src.ItemService.game_data, "get_sprite_ids", lambda texture=None: {0: "128", 1: "129"})
+    return pixels
+
+
+def test_dedup_keeps_id_named_outputs(sheet):
+    processor = PictureProcessor()
+    processor.slice_sheet(name_by_id=True)
+
+    assert sorted(os.listdir(processor.output_dir)) == ["1 4.png", "12 4.png", "128.png", "129.png"]
+    assert np.array_equal(np.asarray(Image.open(f"{processor.output_dir}/128.png")), sheet[:16, :16])
+    assert np.array_equal(np.asarray(Image.open(f"{processor.output_dir}/12 4.png")), sheet[16:, 16:])
+
+
+def test_slice_sheet_matches_divide_by_region_at_edges(workdir):
+    """尺寸不是图块整数倍的精灵图，边缘的图块和序号都与 divide_by_region 一致"""
+    random_image(6, (40, 24)).save("pics/a.png")
+    sliced = PictureProcessor()
+    sliced.output_dir = "output/sliced"
+    os.makedirs(sliced.output_dir)
+    sliced.slice_sheet(skip_empty=False)
+    divided = PictureProcessor()
+    divided.output_dir = "output/divided"
+    os.makedirs(divided.output_dir)
+    divided.divide_by_region(16, 16)
+
+    names = sorted(os.listdir(divided.output_dir))
+    assert len(names) == 6
+    assert sorted(os.listdir(sliced.output_dir)) == names
+    for name in names:
+        expected = np.asarray(Image.open(f"{divided.output_dir}/{name}"))
+        assert np.array_equal(np.asarray(Image.open(f"{sliced.output_dir}/{name}")), expected)
+
+
+def test_cache_restores_id_named_outputs(sheet, tmp_path):
+    first = PictureProcessor(use_cache=True, cache_dir=tmp_path / "cache")
+    first.slice_sheet(name_by_id=True)
+
+    os.remove("pics/12.png")
+    os.rename("pics/1.png", "pics/3.png")
+    second = PictureProcessor(use_cache=True, cache_dir=tmp_path / "cache")
+    second.output_dir = "output/second"
+    os.makedirs(second.output_dir)
+    second.slice_sheet(name_by_id=True)
+
+    assert sorted(os.listdir(second.output_dir)) == ["128.png", "129.png", "3 4.png"]
+    assert np.array_equal(np.asarray(Image.open(f"{second.output_dir}/129.png")), sheet[:16, 16:])
+
+
+def test_failure_summary_counts_all_inputs(workdir, capsys):
+    for i in range(3):
+        random_image(i).save(f"pics/{i}.png")
+    for name in ("broken.png", "broken copy.png"):
+        with open(f"pics/{name}", "wb") as fp:
+            fp.write(b"not a png")
+
+    processor = PictureProcessor()
+    processor.resize_pic(2)
+
+    assert list(processor.errors) == sorted(processor.errors, key=processor.pictures.index)
+    assert set(processor.errors) == {"broken.png", "broken copy.png"}
+    assert "共 5 张图片，2 张处理失败" in capsys.readouterr().out
@@ -0,0 +1,177 @@
+from typing import Callable
+
+import pytest
+from mwclient.errors import ProtectedPageError
+
+import src.MediaWikiBot.Uploader as uploader_module
+from src.MediaWikiBot.LocalSite import LocalSite
+from src.MediaWikiBot.PageCache import PageCache
+from src.MediaWikiBot.Uploader import TokenBucket, Uploader
+
+
+class FlakySite(LocalSite):
+    """编辑指定页面时先失败若干次的 LocalSite"""
+
+    def __init__(self, failures: dict[str, int], error: Callable[[str], Exception] = ConnectionError) -> None:
+        super().__init__()
+        self.failures = dict(failures)
+        self.error = error
+        self.attempts: dict[str, int] = {}
+
+    def save_page(self, name: str, text: str, summary: str = "") -> dict:
+        self.attempts[name] = self.attempts.get(name, 0) + 1
+        if self.failures.get(name, 0) > 0:
+            self.failures[name] -= 1
+            raise self.error("timeout")
+        return super().save_page(name, text, summary)
+
+
+class FakeClock:
+    """替代 time.monotonic 和 time.sleep，sleep 只推进时间而不真正等待"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(uploader_module.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(uploader_module.time, "sleep", clock.sleep)
+    return clock
+
+
+def make_uploader(site: LocalSite, **kwargs) -> Uploader:
+    kwargs = {"summary": "test", "workers": 1, "rate": 1000.0, "burst": 100, "backoff": 2.0, **kwargs}
+    return Uploader(site, **kwargs)
+
+
+def test_retry_with_exponential_backoff(clock):
+    site = FlakySite({"A": 2})
+    report = make_uploader(site).upload([("A", "text")])
+
+    assert report["uploaded"] == ["A"]
+    assert site.attempts["A"] == 3
+    assert clock.sleeps == [2.0, 4.0]
+    assert site.store["A"]["text"] == "text"
+
+
+def test_gives_up_after_retries(clock):
+    site = FlakySite({"A": 10})
+    report = make_uploader(site, retries=2).upload([("A", "text"), ("B", "text")])
+
+    assert report["uploaded"] == ["B"]
+    assert list(report["failed"]) == ["A"]
+    assert site.attempts["A"] == 3
+    assert clock.sleeps == [2.0, 4.0]
+
+
+def test_fatal_errors_are_not_retried(clock):
+    site = FlakySite({"A": 1}, error=lambda info: ProtectedPageError("A", info=info))
+    report = make_uploader(site).upload([("A", "text")])
+
+    assert list(report["failed"]) == ["A"]
+    assert site.attempts["A"] == 1
+    assert clock.sleeps == []
+
+
+def test_resume_from_checkpoint(clock, tmp_path):
+    checkpoint = tmp_path / "upload.jsonl"
+    site = FlakySite({"B": 10})
+    first = make_uploader(site, retries=0, checkpoint=checkpoint).upload([("A", "a"), ("B", "b")])
+    assert first["uploaded"] == ["A"] and list(first["failed"]) == ["B"]
+
+    site.failures.clear()
+    second = make_uploader(site, checkpoint=checkpoint).upload([("A", "a"), ("B", "b"), ("C", "c")])
+    assert second["skipped"] == ["A"]
+    assert sorted(second["uploaded"]) == ["B", "C"]
+    assert site.attempts["A"] == 1
+
+    # 文本变化的页面即使在检查点中也会重新上传
+    third = make_uploader(site, checkpoint=checkpoint).upload([("A", "a2"), ("B", "b")])
+    assert third["uploaded"] == ["A"] and third["skipped"] == ["B"]
+
+
+def test_skip_pages_unchanged_on_wiki(clock):
+    site = LocalSite()
+    site.save_page("A", "{{Infobox\n|name = A\n}}\n")
+    site.save_page("B", "old")
+    edits = len(site.edits)
+
+    cache = PageCache(site)
+    pages = [("A", "{{Infobox\n|name   = A\n}}"), ("B", "new"), ("C", "c")]
+    report = make_uploader(site, cache=cache).upload(pages)
+
+    assert report["unchanged"] == ["A"]
+    assert sorted(report["uploaded"]) == ["B", "C"]
+    assert [edit["title"] for edit in site.edits[edits:]] == ["B", "C"]
+    # 编辑后缓存已更新，再次上传相同的文本不会发出编辑请求
+    again = make_uploader(site, cache=cache).upload([("B", "new"), ("C", "c")])
+    assert again["unchanged"] == ["B", "C"]
+
+
+def test_token_bucket_limits_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_token_bucket_allows_burst(clock):
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.now == 0.0
+    bucket.acquire()
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_upload_respects_rate(clock):
+    site = LocalSite()
+    report = make_uploader(site, rate=4.0, burst=1).upload([(f"P{i}", "x") for i in range(6)])
+
+    assert len(report["uploaded"]) == 6
+    # 第一次编辑使用初始令牌，之后每次等待 0.25 秒
+    assert clock.now == pytest.approx(1.25)
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_resume_does_not_fetch_uploaded_pages(clock, tmp_path):
+    checkpoint = tmp_path / "upload.jsonl"
+    site = LocalSite()
+    make_uploader(site, checkpoint=checkpoint).upload([("A", "a"), ("B", "b")])
+
+    site.queries.clear()
+    report = make_uploader(site, checkpoint=checkpoint, cache=PageCache(site)).upload([("A", "a"), ("C", "c")])
+
+    assert report["skipped"] == ["A"] and report["uploaded"] == ["C"]
+    assert all("A" not in query["titles"].split("|") for query in site.queries)
+
+
+class BrokenSite(LocalSite):
+    """查询 API 总是失败的 LocalSite"""
+
+    def api(self, action: str, **kwargs) -> dict:
+        raise ConnectionError("timeout")
+
+
+def test_cache_is_saved_when_fetch_fails(clock, tmp_path):
+    site = BrokenSite()
+    cache = PageCache(site, tmp_path / "pages.json")
+    cache.update("A", 1, "a")
+
+    with pytest.raises(ConnectionError):
+        make_uploader(site, cache=cache).upload([("B", "b")])
+    assert PageCache(site, tmp_path / "pages.json").get("A") == "a"
@@ -0,0 +1,59 @@
+import pytest
+
+from src.MediaWikiBot.StardewValleyWiki import include_transformer
+from src.MediaWikiBot.Wikitext import is_same, normalize, parse
+
+
+def transform(text: str) -> str:
+    return include_transformer(text=text, type="fish")
+
+
+def test_include_transformer():
+    expected = "<onlyinclude>{{{{{1|Infobox fish}}}\n|name = A\n}}</onlyinclude>"
+    assert transform("{{Infobox fish\n|name = A\n}}") == expected
+
+
+def test_include_transformer_ignores_nowiki_and_comments():
+    for wrapper in ("<nowiki>{{Infobox fish|x}}</nowiki>", "<!-- {{Infobox fish|old}} -->"):
+        text = f"{wrapper}\n{{{{Infobox fish\n|name = B\n}}}}"
+        expected = "\n<onlyinclude>{{{{{1|Infobox fish}}}\n|name = B\n}}</onlyinclude>"
+        assert transform(text) == wrapper + expected
+        assert len(parse(text).find("Infobox fish")) == 1
+
+
+def test_include_transformer_uses_last_of_several_infoboxes():
+    text = "{{Infobox fish|name=1}}\ntext\n{{Infobox fish|name=2}}"
+    expected = "{{Infobox fish|name=1}}\ntext\n<onlyinclude>{{{{{1|Infobox fish}}}|name=2}}</onlyinclude>"
+    assert transform(text) == expected
+
+
+def test_include_transformer_matches_underscores_and_lowercase_first_letter():
+    assert transform("{{Infobox_fish|name = D}}") == "<onlyinclude>{{{{{1|Infobox fish}}}|name = D}}</onlyinclude>"
+    assert transform("{{infobox fish|name = E}}") == "<onlyinclude>{{{{{1|Infobox fish}}}|name = E}}</onlyinclude>"
+
+
+def test_include_transformer_keeps_nested_templates():
+    text = "{{Infobox fish|name={{Name|Carp}}|season={{Season|Spring}}}}"
+    expected = "<onlyinclude>{{{{{1|Infobox fish}}}|name={{Name|Carp}}|season={{Season|Spring}}}}</onlyinclude>"
+    assert transform(text) == expected
+
+
+def test_include_transformer_leaves_converted_pages_unchanged():
+    text = "<onlyinclude>{{{{{1|Infobox fish}}}\n|name = F\n}}</onlyinclude>"
+    assert transform(text) == text
+
+
+def test_include_transformer_requires_infobox():
+    with pytest.raises(ValueError):
+        transform("<nowiki>{{Infobox fish}}</nowiki> {{Infobox seed|name = G}}")
+
+
+def test_is_same_ignores_named_parameter_order_and_whitespace():
+    assert is_same("{{T|a=1|b=2}}", "{{T\n| b = 2\n| a = 1\n}}")
+    assert is_same("{{T|a=1}}  \n\n", "{{T|a=1}}")
+    assert normalize("{{T|b=2|a=1}}") == "{{T|a=1|b=2}}"
+
+
+def test_is_same_keeps_positional_order_and_values():
+    assert not is_same("{{T|1|2}}", "{{T|2|1}}")
+    assert not is_same("{{T|a=1}}", "{{T|a=2}}")